@@ -28,10 +28,38 @@ HTML_SCRIPT_SRC_PATTERN = re.compile(r'<script\s+(?:[^>]*?\s+)?src=(["\'])(?P<ur
 HTML_LINK_HREF_PATTERN = re.compile(r'<link\s+(?:[^>]*?\s+)?href=(["\'])(?P<url>[^"\']+?)\1', re.IGNORECASE) 
 HTML_IMG_SRC_PATTERN = re.compile(r'<img\s+(?:[^>]*?\s+)?src=(["\'])(?P<url>[^"\']+?)\1', re.IGNORECASE)
 CSS_IMPORT_PATTERN = re.compile(r'@import\s+(?:url\s*\(\s*)?["\']?([^"\')\s]+[^"\')]*?)["\']?(?:\s*\))?;', re.IGNORECASE)
+JAVASCRIPT_FUNCTION_PATTERN = re.compile(r'(?:async\s+)?function\s*\*?\s*([a-zA-Z_$][\w$]*)\s*\([^)]*\)')
+JAVASCRIPT_ARROW_FUNCTION_PATTERN = re.compile(r'(?:const|let|var)\s+([a-zA-Z_$][\w$]*)\s*=\s*(?:async\s*)?\([^)]*\)\s*=>')
+JAVASCRIPT_CLASS_PATTERN = re.compile(r'class\s+([a-zA-Z_$][\w$]*)')
+# export function foo() {}  OR export async function foo() {}
+JAVASCRIPT_EXPORT_FUNC_PATTERN = re.compile(r'export\s+(?:async\s+)?function\s*\*?\s*([a-zA-Z_$][\w$]*)')
+# export class Foo {}
+JAVASCRIPT_EXPORT_CLASS_PATTERN = re.compile(r'export\s+class\s+([a-zA-Z_$][\w$]*)')
+# export const foo = ..., export let foo = ..., export var foo = ...
+JAVASCRIPT_EXPORT_VAR_PATTERN = re.compile(r'export\s+(?:const|let|var)\s+([a-zA-Z_$][\w$]*)')
+# export default function foo() {} OR export default function() {}
+JAVASCRIPT_EXPORT_DEFAULT_FUNC_PATTERN = re.compile(r'export\s+default\s+(?:async\s+)?function\s*\*?\s*([a-zA-Z_$][\w$]*)?')
+# export default class Foo {} OR export default class {}
+JAVASCRIPT_EXPORT_DEFAULT_CLASS_PATTERN = re.compile(r'export\s+default\s+class\s+([a-zA-Z_$][\w$]*)?')
+# export default foo; (where foo is already defined)
+JAVASCRIPT_EXPORT_DEFAULT_IDENTIFIER_PATTERN = re.compile(r'export\s+default\s+([a-zA-Z_$][\w$]*);')
+# export { name1, name2 as alias }
+JAVASCRIPT_EXPORT_NAMED_BLOCK_PATTERN = re.compile(r'export\s*{\s*([^}]+)\s*}')
+MARKDOWN_CODE_BLOCK_PATTERN = re.compile(r'```(\w+)?\n(.*?)```', re.DOTALL)
+HTML_LINK_TAG_PATTERN = re.compile(r'<link([^>]+)>', re.IGNORECASE)
+HTML_HREF_ATTR_PATTERN = re.compile(r'href=(["\'])(?P<url>[^"\']+?)\1', re.IGNORECASE)
+HTML_REL_STYLESHEET_PATTERN = re.compile(r'rel=(["\'])stylesheet\1', re.IGNORECASE)
 
 # --- Main Analysis Function ---
+def _mtime_or_zero(file_path: str) -> float:
+    """mtime from a single stat, or 0 if the file is missing (the previous exists + getmtime pair took two)."""
+    try:
+        return os.stat(file_path).st_mtime
+    except OSError:
+        return 0
+
 @cached("file_analysis",
-       key_func=lambda file_path, force=False: f"analyze_file:{normalize_path(file_path)}:{(os.path.getmtime(file_path) if os.path.exists(file_path) else 0)}:{force}")
+       key_func=lambda file_path, force=False: f"analyze_file:{normalize_path(file_path)}:{_mtime_or_zero(file_path)}:{force}")
 def analyze_file(file_path: str, force: bool = False) -> Dict[str, Any]:
     """
     Analyzes a file to identify dependencies, imports, and other metadata.
@@ -46,7 +74,7 @@ def analyze_file(file_path: str, force: bool = False) -> Dict[str, Any]:
         Dictionary containing analysis results (without AST for Python files) or error/skipped status.
     """
     norm_file_path = normalize_path(file_path)
-    if not os.path.exists(norm_file_path) or not os.path.isfile(norm_file_path): 
+    if not os.path.isfile(norm_file_path): # False for missing paths too
         return {"error": "File not found or not a file", "file_path": norm_file_path}
 
     config_manager = ConfigManager(); project_root = get_project_root()
@@ -65,13 +93,17 @@ def analyze_file(file_path: str, force: bool = False) -> Dict[str, Any]:
         return {"skipped": True, "reason": "Excluded path, extension, or tracker file", "file_path": norm_file_path}
 
     # --- Binary File Check ---
+    # Text files are read in full here; text analysis below decodes these bytes instead of reopening the file
+    raw_content: Optional[bytes] = None
     try:
         with open(norm_file_path, 'rb') as f_check_binary:
             # Read a small chunk to check for null bytes, common in many binary files
             # This is a heuristic, not a perfect binary detector.
-            if b'\0' in f_check_binary.read(1024):
+            head_chunk = f_check_binary.read(1024)
+            if b'\0' in head_chunk:
                 logger.debug(f"Skipping analysis of binary file: {norm_file_path}")
                 return {"skipped": True, "reason": "Binary file detected", "file_path": norm_file_path, "size": os.path.getsize(norm_file_path)}
+            raw_content = head_chunk + f_check_binary.read()
     except FileNotFoundError: return {"error": "File disappeared before binary check", "file_path": norm_file_path}
     except Exception as e_bin_check:
         logger.warning(f"Error during binary check for {norm_file_path}: {e_bin_check}. Proceeding with text analysis attempt.")
@@ -88,7 +120,11 @@ def analyze_file(file_path: str, force: bool = False) -> Dict[str, Any]:
             "exceptions_handled": [], "with_contexts_used": []
         }
         try:
-            with open(norm_file_path, 'r', encoding='utf-8') as f: content = f.read()
+            if raw_content is not None:
+                # Same result as a text-mode read: UTF-8 decode plus universal newline translation
+                content = raw_content.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+            else:
+                with open(norm_file_path, 'r', encoding='utf-8') as f: content = f.read()
         except FileNotFoundError: return {"error": "File disappeared during analysis", "file_path": norm_file_path}
         except UnicodeDecodeError as e: 
             logger.warning(f"Encoding error reading {norm_file_path} as UTF-8: {e}. File might be non-text or use different encoding.")
@@ -185,6 +221,13 @@ def _analyze_python_file(file_path: str, content: str, result: Dict[str, Any]) -
         if isinstance(node, ast.Call): return _get_full_name_str(node.func) 
         if isinstance(node, ast.Subscript): return _get_full_name_str(node.value)
         return None
+    def _get_call_item_name(func_node: ast.AST) -> Optional[str]:
+        """Name of the item actually invoked by a call, without qualifier or '()' (e.g. 'mod.Cls().m' -> 'm')."""
+        if isinstance(func_node, ast.Name): return func_node.id
+        if isinstance(func_node, ast.Attribute): return func_node.attr
+        if isinstance(func_node, ast.Call): return _get_call_item_name(func_node.func) # f()() invokes the result of f
+        full_name = _get_full_name_str(func_node)
+        return full_name.split('.')[-1] if full_name else None
     def _extract_type_names_from_annotation(annotation_node: Optional[ast.AST]) -> Set[str]: # Included for completeness
         names: Set[str] = set()
         if not annotation_node:
@@ -227,11 +270,6 @@ def _analyze_python_file(file_path: str, content: str, result: Dict[str, Any]) -
         
         logger.debug(f"DEBUG DA: Parsed {file_path}. AST tree assigned to result['_ast_tree']. Type: {type(result['_ast_tree'])}")
         
-        for node_with_parent in ast.walk(tree):
-            for child in ast.iter_child_nodes(node_with_parent):
-                setattr(child, '_parent', node_with_parent)
-        logger.debug(f"DEBUG DA: Parent pointers added for {file_path}.")
-        
         # Pass 1: Populate top-level definitions
         for node in tree.body: 
             if isinstance(node, ast.Import):
@@ -263,8 +301,11 @@ def _analyze_python_file(file_path: str, content: str, result: Dict[str, Any]) -
 
         logger.debug(f"DEBUG DA: tree.body processed for {file_path}.")
         
-        # Pass 2: ast.walk for detailed analysis
+        # Pass 2: ast.walk for detailed analysis. Parent pointers are set on the way down: the walk is breadth-first,
+        # so every node's '_parent' is in place before the node itself is visited (and for later readers of the tree).
         for node in ast.walk(tree):
+            for child in ast.iter_child_nodes(node):
+                setattr(child, '_parent', node)
             # Decorators (for all functions/classes, top-level or nested)
             if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
                 parent = getattr(node, '_parent', None)
@@ -358,7 +399,8 @@ def _analyze_python_file(file_path: str, content: str, result: Dict[str, Any]) -
                 target_full_name = _get_full_name_str(node.func)
                 potential_source = _get_source_object_str(node.func)
                 if target_full_name: 
-                    result["calls"].append({"target_name": target_full_name, "potential_source": potential_source, "line": node.lineno})
+                    result["calls"].append({"target_name": target_full_name, "potential_source": potential_source,
+                                            "item_name": _get_call_item_name(node.func), "is_call": True, "line": node.lineno})
             # Attribute Accesses
             elif isinstance(node, ast.Attribute) and isinstance(node.ctx, ast.Load):
                  attribute_name = node.attr
@@ -405,55 +447,35 @@ def _analyze_javascript_file(file_path: str, content: str, result: Dict[str, Any
     result.setdefault("classes", [])
     result.setdefault("exports", []) 
 
-    import_matches = JAVASCRIPT_IMPORT_PATTERN.finditer(content)
-    result["imports"] = [m.group(1) or m.group(2) or m.group(3) for m in import_matches if m and (m.group(1) or m.group(2) or m.group(3))]
+    # One pass of the fused import/require/dynamic-import pattern; each branch captures exactly one (non-empty) group
+    result["imports"] = [m[m.lastindex] for m in JAVASCRIPT_IMPORT_PATTERN.finditer(content)]
     
     try: 
         # Basic function and class detection (already present)
-        func_pattern = re.compile(r'(?:async\s+)?function\s*\*?\s*([a-zA-Z_$][\w$]*)\s*\([^)]*\)')
-        arrow_pattern = re.compile(r'(?:const|let|var)\s+([a-zA-Z_$][\w$]*)\s*=\s*(?:async\s*)?\([^)]*\)\s*=>')
-        class_pattern = re.compile(r'class\s+([a-zA-Z_$][\w$]*)')
-        for match in func_pattern.finditer(content): 
+        for match in JAVASCRIPT_FUNCTION_PATTERN.finditer(content): 
             result["functions"].append({"name": match.group(1), "line": content[:match.start()].count('\n') + 1})
-        for match in arrow_pattern.finditer(content): 
+        for match in JAVASCRIPT_ARROW_FUNCTION_PATTERN.finditer(content): 
             result["functions"].append({"name": match.group(1), "line": content[:match.start()].count('\n') + 1, "type": "arrow"})
-        for match in class_pattern.finditer(content): 
+        for match in JAVASCRIPT_CLASS_PATTERN.finditer(content): 
             result["classes"].append({"name": match.group(1), "line": content[:match.start()].count('\n') + 1})
 
-        # NEW: Basic regex for exports (can be improved with more specific patterns)
-        # export function foo() {}  OR export async function foo() {}
-        export_func_pattern = re.compile(r'export\s+(?:async\s+)?function\s*\*?\s*([a-zA-Z_$][\w$]*)')
-        # export class Foo {}
-        export_class_pattern = re.compile(r'export\s+class\s+([a-zA-Z_$][\w$]*)')
-        # export const foo = ..., export let foo = ..., export var foo = ...
-        export_var_pattern = re.compile(r'export\s+(?:const|let|var)\s+([a-zA-Z_$][\w$]*)')
-        # export default function foo() {} OR export default function() {}
-        export_default_func_pattern = re.compile(r'export\s+default\s+(?:async\s+)?function\s*\*?\s*([a-zA-Z_$][\w$]*)?')
-        # export default class Foo {} OR export default class {}
-        export_default_class_pattern = re.compile(r'export\s+default\s+class\s+([a-zA-Z_$][\w$]*)?')
-        # export default foo; (where foo is already defined)
-        export_default_identifier_pattern = re.compile(r'export\s+default\s+([a-zA-Z_$][\w$]*);')
-        # --- ADDED: Regex for export { name1, name2 as alias } ---
-        export_named_block_pattern = re.compile(r'export\s*{\s*([^}]+)\s*}')
-        # ---
-
-        for match in export_func_pattern.finditer(content):
+        for match in JAVASCRIPT_EXPORT_FUNC_PATTERN.finditer(content):
             result["exports"].append({"name": match.group(1), "type": "function", "line": content[:match.start()].count('\n') + 1})
-        for match in export_class_pattern.finditer(content):
+        for match in JAVASCRIPT_EXPORT_CLASS_PATTERN.finditer(content):
             result["exports"].append({"name": match.group(1), "type": "class", "line": content[:match.start()].count('\n') + 1})
-        for match in export_var_pattern.finditer(content):
+        for match in JAVASCRIPT_EXPORT_VAR_PATTERN.finditer(content):
             result["exports"].append({"name": match.group(1), "type": "variable", "line": content[:match.start()].count('\n') + 1})
-        for match in export_default_func_pattern.finditer(content):
+        for match in JAVASCRIPT_EXPORT_DEFAULT_FUNC_PATTERN.finditer(content):
             name = match.group(1) or "_default_function" # Handle anonymous default function
             result["exports"].append({"name": name, "type": "function", "is_default": True, "line": content[:match.start()].count('\n') + 1})
-        for match in export_default_class_pattern.finditer(content):
+        for match in JAVASCRIPT_EXPORT_DEFAULT_CLASS_PATTERN.finditer(content):
             name = match.group(1) or "_default_class" # Handle anonymous default class
             result["exports"].append({"name": name, "type": "class", "is_default": True, "line": content[:match.start()].count('\n') + 1})
-        for match in export_default_identifier_pattern.finditer(content):
+        for match in JAVASCRIPT_EXPORT_DEFAULT_IDENTIFIER_PATTERN.finditer(content):
             result["exports"].append({"name": match.group(1), "type": "identifier", "is_default": True, "line": content[:match.start()].count('\n') + 1})
         
-        # --- ADDED: Processing for export_named_block_pattern ---
-        for match in export_named_block_pattern.finditer(content):
+        # --- ADDED: Processing for JAVASCRIPT_EXPORT_NAMED_BLOCK_PATTERN ---
+        for match in JAVASCRIPT_EXPORT_NAMED_BLOCK_PATTERN.finditer(content):
             items_str = match.group(1) # Content inside {}
             line_num = content[:match.start()].count('\n') + 1
             # Split by comma, then process each item for potential "as" alias
@@ -481,8 +503,7 @@ def _analyze_markdown_file(file_path: str, content: str, result: Dict[str, Any])
             if url and not url.startswith(('#', 'http:', 'https:', 'mailto:', 'tel:')): result["links"].append({"url": url, "line": content[:match.start()].count('\n') + 1})
     except Exception as e: logger.warning(f"Regex error during MD link analysis in {file_path}: {e}")
     try: 
-        code_block_pattern = re.compile(r'```(\w+)?\n(.*?)```', re.DOTALL)
-        for match in code_block_pattern.finditer(content):
+        for match in MARKDOWN_CODE_BLOCK_PATTERN.finditer(content):
              lang = match.group(1) or "text"; 
              result["code_blocks"].append({"language": lang.lower(), "line": content[:match.start()].count('\n') + 1})
     except Exception as e: logger.warning(f"Regex error during MD code block analysis in {file_path}: {e}")
@@ -503,9 +524,8 @@ def _analyze_html_file(file_path: str, content: str, result: Dict[str, Any]) ->
         except Exception as e: logger.warning(f"Regex error during HTML {type_list_name} analysis in {file_path}: {e}")
     find_resources(HTML_A_HREF_PATTERN, "links"); find_resources(HTML_SCRIPT_SRC_PATTERN, "scripts"); find_resources(HTML_IMG_SRC_PATTERN, "images")
     try: 
-        link_tag_pattern = re.compile(r'<link([^>]+)>', re.IGNORECASE); href_pattern = re.compile(r'href=(["\'])(?P<url>[^"\']+?)\1', re.IGNORECASE); rel_pattern = re.compile(r'rel=(["\'])stylesheet\1', re.IGNORECASE)
-        for link_match in link_tag_pattern.finditer(content):
-            tag_content = link_match.group(1); href_match = href_pattern.search(tag_content); rel_match = rel_pattern.search(tag_content)
+        for link_match in HTML_LINK_TAG_PATTERN.finditer(content):
+            tag_content = link_match.group(1); href_match = HTML_HREF_ATTR_PATTERN.search(tag_content); rel_match = HTML_REL_STYLESHEET_PATTERN.search(tag_content)
             if href_match and rel_match:
                 url = href_match.group("url")
                 if url and not url.startswith(('#', 'http:', 'https:', 'mailto:', 'tel:', 'data:')): result["stylesheets"].append({"url": url, "line": content[:link_match.start()].count('\n') + 1})
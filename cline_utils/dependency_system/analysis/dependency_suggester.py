@@ -7,12 +7,20 @@ Assigns specific characters based on the type of dependency found.
 Outputs path-based dependencies: List[Tuple[target_norm_path, char]]
 """
 
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
+from itertools import chain
 import json
+import numpy as np
+import pickle
 import re
 import os
-from typing import Dict, List, Tuple, Optional, Any
+import stat
+import sys
+from typing import Callable, Dict, Iterable, List, NamedTuple, Set, Tuple, Optional, Any
 import ast
+import builtins
 
 # Attempt to import jsonc-parser
 try:
@@ -50,21 +58,254 @@ logger = logging.getLogger(__name__)
 # S: Semantic dependency (strong .07+) - Added based on .clinerules
 
 _PROJECT_SYMBOL_MAP_FILENAME_LOCAL = "project_symbol_map.json"
+_PROJECT_SYMBOL_MAP_BINARY_FILENAME_LOCAL = "project_symbol_map.pkl" # Pickle sidecar, written alongside the JSON by project_analyzer
+# Both live in the same directory as key_manager.py; resolved once instead of on every load/cache-key call
+_SYMBOL_MAP_CORE_DIR = os.path.dirname(os.path.abspath(sys.modules[KeyInfo.__module__].__file__))
+_PROJECT_SYMBOL_MAP_PATH = normalize_path(os.path.join(_SYMBOL_MAP_CORE_DIR, _PROJECT_SYMBOL_MAP_FILENAME_LOCAL))
+_PROJECT_SYMBOL_MAP_BINARY_PATH = normalize_path(os.path.join(_SYMBOL_MAP_CORE_DIR, _PROJECT_SYMBOL_MAP_BINARY_FILENAME_LOCAL))
 # _OLD_PROJECT_SYMBOL_MAP_FILENAME_LOCAL = "project_symbol_map_old.json" # Not used by load, only by save
+
+class ASTLink(NamedTuple):
+    """An AST-verified dependency link (serialized to ast_verified_links.json via _asdict())."""
+    source_path: str
+    target_path: str
+    char: str
+    reason: str
+
+# --- Module-level caches (cleared by clear_caches) ---
+_IMPORT_MAP_CACHE: Dict[str, Dict[str, str]] = {}                     # norm source path -> {name in scope: module path}
+_RESOLVED_PATH_CACHE: Dict[Tuple[str, str], Optional[str]] = {}       # (source path, dotted name) -> module path
+_TSCONFIG_CACHE: Dict[str, Optional[Tuple[str, Dict[str, Any]]]] = {} # directory -> (config path, parsed data) or None
+_TSCONFIG_LOOKUP_CACHE: Dict[Tuple[str, str], Optional[Tuple[str, Dict[str, Any]]]] = {} # (start dir, project root) -> nearest usable config
+_ALIAS_TRIE_CACHE: Dict[int, Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]] = {} # id(paths) -> (paths, exact aliases, wildcard trie)
+_UNRESOLVED_JS_IMPORTS: set = set()                                   # (tsconfig path, bare specifier) that resolved to nothing (reset per batch)
+_PATH_KIND_CACHE: Dict[str, int] = {}                                  # path -> _PATH_MISSING/_PATH_FILE/_PATH_DIR (reset per batch)
+_DIR_ENTRIES_CACHE: Dict[str, Optional[Tuple[frozenset, frozenset]]] = {} # directory -> (file names, subdirectory names) or None (reset per batch)
+_JS_STEM_INDEX_CACHE: Dict[str, Dict[str, str]] = {}                   # directory -> {name minus JS/TS extension: file name} (reset per batch)
+_SYMBOL_INDEX_CACHE: Dict[str, Any] = {"map": None, "index": {}}      # flat form of the last project_symbol_map object seen
+_SUGGESTION_CONTEXT_CACHE: Dict[str, Any] = {"key": None, "context": None} # context for the last path_to_key_info seen
+
+# Names that can never refer to a tracked module unless the file explicitly imports them
+# (builtins plus implicit receivers); checked before any prefix walk in _resolve_name_to_path.
+_NEVER_RESOLVABLE = frozenset(dir(builtins)) | {"self", "cls", "super", "__class__"}
+
 def clear_caches():
     clear_all_caches() 
-    if hasattr(_find_and_parse_tsconfig, '_cache'): 
-        _find_and_parse_tsconfig._cache.clear() # type: ignore 
-    if hasattr(_identify_structural_dependencies, '_import_map_cache'):
-         _identify_structural_dependencies._import_map_cache.clear() # type: ignore
-    if hasattr(_identify_structural_dependencies, '_resolved_path_cache'):
-         _identify_structural_dependencies._resolved_path_cache.clear() # type: ignore
-    if hasattr(load_project_symbol_map, '_cache'):
-        load_project_symbol_map._cache.clear() # type: ignore
+    _IMPORT_MAP_CACHE.clear()
+    _RESOLVED_PATH_CACHE.clear()
+    _TSCONFIG_CACHE.clear()
+    _TSCONFIG_LOOKUP_CACHE.clear()
+    _ALIAS_TRIE_CACHE.clear()
+    _UNRESOLVED_JS_IMPORTS.clear()
+    _PATH_KIND_CACHE.clear()
+    _DIR_ENTRIES_CACHE.clear()
+    _JS_STEM_INDEX_CACHE.clear()
+    _SYMBOL_INDEX_CACHE.update(map=None, index={})
+    _SUGGESTION_CONTEXT_CACHE.update(key=None, context=None)
+    _SEMANTIC_BATCH_RESULTS.update(key=None, results={})
+
+def _strip_query_fragment(url: str) -> str:
+    """Returns `url` up to its first '#' or '?' (same as split('#')[0].split('?')[0], without the lists)."""
+    end = len(url)
+    hash_idx = url.find('#')
+    if hash_idx != -1:
+        end = hash_idx
+    query_idx = url.find('?', 0, end)
+    if query_idx != -1:
+        end = query_idx
+    return url[:end]
+
+def _join_normalized(base_dir: str, rel_path: str) -> str:
+    """
+    Joins a normalized absolute directory and a relative link/import path into a normalized path.
+    Leading './' and '../' segments are applied by string slicing, and a clean remainder (no dot/empty
+    segments, backslashes or colons) is concatenated directly; anything else goes through normalize_path (normpath of the join).
+    """
+    base, rel = base_dir, rel_path
+    while True:
+        if rel.startswith('./'):
+            rel = rel[2:]
+        elif rel.startswith('../') and base.rfind('/') > 0:
+            base, rel = base[:base.rfind('/')], rel[3:]
+        else:
+            break
+    if rel and not base.endswith('/') and not rel.startswith('/') and not rel.endswith(('/', '.')) \
+       and './' not in rel and '//' not in rel and '\\' not in rel and ':' not in rel:
+        return f"{base}/{rel}"
+    return normalize_path(os.path.join(base_dir, rel_path)) # base_dir is absolute, so no abspath (getcwd) needed
+
+# --- Path Probe Cache ---
+_PATH_MISSING, _PATH_FILE, _PATH_DIR = 0, 1, 2
+
+def _path_kind(path: str) -> int:
+    """Classifies a path with a single os.stat, memoized (positive and negative) in _PATH_KIND_CACHE."""
+    kind = _PATH_KIND_CACHE.get(path)
+    if kind is None:
+        try:
+            mode = os.stat(path).st_mode
+            kind = _PATH_FILE if stat.S_ISREG(mode) else _PATH_DIR if stat.S_ISDIR(mode) else _PATH_MISSING
+        except (OSError, ValueError):
+            kind = _PATH_MISSING
+        _PATH_KIND_CACHE[path] = kind
+    return kind
+
+def _cached_isdir(path: str) -> bool:
+    return _path_kind(path) == _PATH_DIR
+
+def _dir_entries(directory: str) -> Optional[Tuple[frozenset, frozenset]]:
+    """
+    Lists a directory once with os.scandir, memoized in _DIR_ENTRIES_CACHE, so probing several
+    candidate names in it (extensions, index files) costs one listing instead of one stat each.
+
+    Returns:
+        (file names, subdirectory names), or None if `directory` is not a readable directory.
+    """
+    if directory in _DIR_ENTRIES_CACHE:
+        return _DIR_ENTRIES_CACHE[directory]
+    file_names, subdir_names = [], []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    if entry.is_file(): file_names.append(entry.name)
+                    elif entry.is_dir(): subdir_names.append(entry.name)
+                except OSError:
+                    continue
+        result: Optional[Tuple[frozenset, frozenset]] = (frozenset(file_names), frozenset(subdir_names))
+    except OSError:
+        result = None
+    _DIR_ENTRIES_CACHE[directory] = result
+    return result
+
+def _is_listed_file(path: str) -> bool:
+    """os.path.isfile for a normalized path, answered from its parent's _dir_entries listing (shared by all resolvers)."""
+    parent_dir, name = os.path.split(path)
+    parent_entries = _dir_entries(parent_dir)
+    return parent_entries is not None and name in parent_entries[0]
+
+# --- Symbol Map Index ---
+_SYMBOL_KINDS = ("functions", "classes", "globals_defined")
+
+class ModuleSymbols(NamedTuple):
+    """Flat name sets for one module of the project symbol map (the suggester only asks 'is X defined in Y?')."""
+    functions: frozenset
+    classes: frozenset
+    globals_defined: frozenset
+    all_names: frozenset # Union of the three kinds
+
+_EMPTY_SYMBOL_INDEX = ModuleSymbols(frozenset(), frozenset(), frozenset(), frozenset())
+
+def flatten_symbol_map(project_symbol_map: Dict[str, Dict[str, Any]]) -> Dict[str, ModuleSymbols]:
+    """
+    Builds the flat form of the project symbol map: {path: ModuleSymbols}, one tuple of frozensets per module
+    instead of a list of per-symbol dicts per kind. The full map is only needed where symbol metadata is.
+    The result is memoized for the map object it was built from (load_project_symbol_map returns a cached object).
+    """
+    if _SYMBOL_INDEX_CACHE["map"] is project_symbol_map:
+        return _SYMBOL_INDEX_CACHE["index"]
+    index: Dict[str, ModuleSymbols] = {}
+    intern = sys.intern
+    for module_path, module_symbols in project_symbol_map.items():
+        # Interned names make the equality check after a hash match a pointer comparison
+        functions, classes, globals_defined = (
+            frozenset(intern(name) for item in module_symbols.get(kind, []) if isinstance(name := item.get('name'), str))
+            for kind in _SYMBOL_KINDS)
+        index[module_path] = ModuleSymbols(functions, classes, globals_defined, functions | classes | globals_defined)
+    _SYMBOL_INDEX_CACHE.update(map=project_symbol_map, index=index)
+    return index
+
+def _module_symbol_index(project_symbol_map: Dict[str, Dict[str, Any]], module_path: str) -> ModuleSymbols:
+    """Returns the name sets for one module (empty sets if the module is not in the symbol map)."""
+    return flatten_symbol_map(project_symbol_map).get(module_path, _EMPTY_SYMBOL_INDEX)
+
+# --- Import Statement Scan ---
+# Imports are statements, and statements only nest inside other statements, except handlers and match cases
+_STATEMENT_CONTAINER_TYPES = (ast.stmt, ast.excepthandler) + ((ast.match_case,) if hasattr(ast, "match_case") else ())
+
+def _iter_import_nodes(tree: ast.AST) -> Iterable[ast.AST]:
+    """
+    Yields the ast.Import/ast.ImportFrom nodes of `tree` in the same (breadth-first) order as ast.walk,
+    including imports inside functions, classes and blocks, without descending into expression subtrees.
+    """
+    pending = deque((tree,))
+    while pending:
+        node = pending.popleft()
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            yield node
+            continue # Import nodes only have alias children
+        pending.extend(child for child in ast.iter_child_nodes(node) if isinstance(child, _STATEMENT_CONTAINER_TYPES))
+
+# --- Suggestion Context ---
+class SuggestionContext(NamedTuple):
+    """Run-wide invariants shared by the per-file suggesters, built once instead of per file."""
+    project_root_norm: str
+    tracked_paths: frozenset             # Normalized paths of all tracked files/dirs (keys of path_to_key_info)
+    code_roots_rel: Tuple[str, ...]      # Code roots as configured (relative to project root)
+    abs_code_roots: Tuple[str, ...]      # Same roots, normalized absolute paths
+    abs_doc_roots: Tuple[str, ...]       # Doc roots as normalized absolute paths ((project root,) if none configured)
+    doc_roots_rel: Tuple[str, ...]       # Doc roots as configured (relative to project root)
+    embeddings_dir_abs: str              # Normalized absolute embeddings directory
+    semantic_strong_threshold: float     # code_similarity threshold: semantic scores at or above it are 'S'
+    semantic_targets: Tuple[KeyInfo, ...] # File (non-directory) KeyInfos in path_to_key_info order: every semantic target
+    semantic_target_keys: List[str]      # Their key strings, as passed to calculate_similarities_batch (do not mutate)
+    semantic_target_position: Dict[str, int] # norm_path -> index in semantic_targets
+    import_resolution_cache: Dict[Tuple[str, str, int, Optional[str]], List[Tuple[str, bool]]] # See _convert_python_import_to_paths
+
+def _get_suggestion_context(path_to_key_info: Dict[str, KeyInfo], project_root: str) -> SuggestionContext:
+    """
+    Returns the SuggestionContext for this path_to_key_info/project_root, reusing the last one built
+    for the same map object (reset by clear_caches).
+    """
+    cache_key = _SUGGESTION_CONTEXT_CACHE["key"]
+    if cache_key is not None and cache_key[0] is path_to_key_info and \
+       cache_key[1] == project_root and cache_key[2] == len(path_to_key_info):
+        return _SUGGESTION_CONTEXT_CACHE["context"]
 
+    project_root_norm = normalize_path(project_root)
+    try:
+        code_roots_rel = tuple(ConfigManager().get_code_root_directories())
+    except Exception as e_cfg:
+        logger.warning(f"Error getting code_root_directories for suggestion context: {e_cfg}")
+        code_roots_rel = ()
+    # get_doc_directories returns relative paths; HTML root-relative links fall back to the project root if none are configured
+    try:
+        doc_roots_rel = tuple(ConfigManager().get_doc_directories())
+    except Exception as e_cfg:
+        logger.warning(f"Error getting doc_directories for suggestion context: {e_cfg}")
+        doc_roots_rel = ()
+    abs_doc_roots = tuple(normalize_path(os.path.join(project_root_norm, dr)) for dr in doc_roots_rel) or (project_root_norm,)
+    # Every config getter re-stats the config file, so the semantic settings are read once here rather than per file
+    config = ConfigManager()
+    embeddings_dir_rel = config.get_path("embeddings_dir", "cline_utils/dependency_system/analysis/embeddings")
+    semantic_targets = tuple(info for info in path_to_key_info.values() if not info.is_directory)
+    context = SuggestionContext(
+        project_root_norm=project_root_norm,
+        tracked_paths=frozenset(path_to_key_info),
+        code_roots_rel=code_roots_rel,
+        abs_code_roots=tuple(normalize_path(os.path.join(project_root_norm, cr)) for cr in code_roots_rel),
+        abs_doc_roots=abs_doc_roots,
+        doc_roots_rel=doc_roots_rel,
+        embeddings_dir_abs=normalize_path(os.path.join(project_root, embeddings_dir_rel)),
+        semantic_strong_threshold=config.get_threshold("code_similarity"),
+        semantic_targets=semantic_targets,
+        semantic_target_keys=[info.key_string for info in semantic_targets],
+        semantic_target_position={info.norm_path: position for position, info in enumerate(semantic_targets)},
+        import_resolution_cache={},
+    )
+    _SUGGESTION_CONTEXT_CACHE.update(key=(path_to_key_info, project_root, len(path_to_key_info)), context=context)
+    return context
+
+def _metadata_cache_key(metadata_path: str) -> str:
+    """Cache key for load_metadata: the path plus one stat of it, so an edited file is re-read and an unchanged one is not."""
+    try:
+        return f"metadata:{normalize_path(metadata_path)}:{os.stat(metadata_path).st_mtime_ns}"
+    except OSError:
+        return f"metadata:{normalize_path(metadata_path)}:missing"
+
+@cached("embedding_metadata", key_func=_metadata_cache_key)
 def load_metadata(metadata_path: str) -> Dict[str, Any]:
     """
-    Load metadata file with caching.
+    Load metadata file with caching (keyed on its mtime; callers share the returned dict and must not mutate it).
 
     Args:
         metadata_path: Path to the metadata file
@@ -79,75 +320,218 @@ def load_metadata(metadata_path: str) -> Dict[str, Any]:
     except Exception as e: logger.exception(f"Unexpected error reading metadata {metadata_path}: {e}"); return {}
 
 # --- TS/JS Config Helper ---
+_JS_CONFIG_FILENAMES = ("tsconfig.json", "jsconfig.json") # In lookup priority order
+_JS_EXTENSIONS = ('.js', '.jsx', '.ts', '.tsx', '.mjs', '.cjs') # Probe order; also passed to str.endswith as a tuple
+_JS_EXTENSION_RANK = {ext: rank for rank, ext in enumerate(_JS_EXTENSIONS)}
+
+# Link/import prefixes that never point at a project file (anchors, other schemes, remote or inline resources)
+_SKIP_URL_PREFIXES = ('#', 'mailto:', 'tel:', 'http:', 'https:', '//', 'data:') # Markdown and HTML links
+_SKIP_JS_PREFIXES = ('http:', 'https:', '//', 'data:')                          # JS/TS import specifiers
+_SKIP_CSS_PREFIXES = ('#', 'http:', 'https:', '//', 'data:')                    # CSS @import urls
+
+
+def _dir_config(directory: str) -> Optional[Tuple[str, Optional[Dict[str, Any]]]]:
+    """
+    Returns the tsconfig/jsconfig found directly in `directory` (memoized per directory in _TSCONFIG_CACHE).
+
+    Returns:
+        None if the directory holds no config file, otherwise (config_file_path, parsed_data_dict),
+        where parsed_data_dict is None if the file could not be parsed.
+    """
+    if directory in _TSCONFIG_CACHE:
+        return _TSCONFIG_CACHE[directory]
+
+    # One directory listing instead of exists()+isfile() stats per candidate filename
+    present_files = set()
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.name in _JS_CONFIG_FILENAMES and entry.is_file():
+                    present_files.add(entry.name)
+    except OSError:
+        pass
+
+    result: Optional[Tuple[str, Optional[Dict[str, Any]]]] = None
+    for filename in _JS_CONFIG_FILENAMES:
+        if filename not in present_files:
+            continue
+        config_path = os.path.join(directory, filename)
+        logger.debug(f"Found config file for JS/TS: {config_path}")
+        data: Optional[Dict[str, Any]] = None
+        try:
+            if JSONC_PARSER_AVAILABLE and JsoncParser: # Check JsoncParser is not None
+                data = JsoncParser.parse_file(config_path) # type: ignore
+                logger.debug(f"Successfully parsed {config_path} using jsonc-parser.")
+            else:
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                logger.debug(f"Successfully parsed {config_path} using standard json parser.")
+        except (FileError, ParserError, JsoncFunctionParameterError) as e_jsonc: # Catch specific jsonc-parser errors
+            logger.warning(f"Error parsing {config_path} with jsonc-parser: {e_jsonc}. Skipping this config.")
+        except json.JSONDecodeError as e_json:
+            logger.warning(f"JSONDecodeError parsing {config_path}: {e_json}. File might have comments and jsonc-parser is not available/failed.")
+        result = (config_path, data)
+        break
+
+    _TSCONFIG_CACHE[directory] = result
+    return result
+
 @cached("tsconfig_data", 
         key_func=lambda start_dir, project_root_val: f"tsconfig:{normalize_path(start_dir)}:{normalize_path(project_root_val)}")
 def _find_and_parse_tsconfig(start_dir: str, project_root_val: str) -> Optional[Tuple[str, Dict[str, Any]]]:
     """
     Finds tsconfig.json or jsconfig.json by walking up from start_dir to project_root_val.
     Parses the first one found using jsonc-parser if available, otherwise standard json.
-    Caches the result based on start_dir and project_root_val.
+    Caches the result based on start_dir and project_root_val; every directory visited on the
+    walk is also recorded in _TSCONFIG_LOOKUP_CACHE, so walks from sibling/child directories
+    stop at the first already-resolved ancestor.
 
     Returns:
         Tuple of (config_file_path, parsed_data_dict) or None if not found/parsed.
     """
     current_dir = normalize_path(start_dir)
     project_root_norm = normalize_path(project_root_val)
-    config_filenames = ["tsconfig.json", "jsconfig.json"]
+    _dirname = os.path.dirname
+    visited_dirs: List[str] = []
+    result: Optional[Tuple[str, Dict[str, Any]]] = None
     while True:
-        for filename in config_filenames:
-            config_path = os.path.join(current_dir, filename)
-            if os.path.exists(config_path) and os.path.isfile(config_path):
-                logger.debug(f"Found config file for JS/TS: {config_path}")
-                try:
-                    if JSONC_PARSER_AVAILABLE and JsoncParser: # Check JsoncParser is not None
-                        # Ensure JsoncParser.parse_file is called correctly
-                        data = JsoncParser.parse_file(config_path) # type: ignore
-                        logger.debug(f"Successfully parsed {config_path} using jsonc-parser.")
-                        return config_path, data
-                    else:
-                        with open(config_path, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                        logger.debug(f"Successfully parsed {config_path} using standard json parser.")
-                        return config_path, data
-                except (FileError, ParserError, JsoncFunctionParameterError) as e_jsonc: # Catch specific jsonc-parser errors
-                    logger.warning(f"Error parsing {config_path} with jsonc-parser: {e_jsonc}. Skipping this config.")
-                    return None # Or try standard json as fallback? For now, skip on error.
-                except json.JSONDecodeError as e_json:
-                    logger.warning(f"JSONDecodeError parsing {config_path}: {e_json}. File might have comments and jsonc-parser is not available/failed.")
-                    return None
+        lookup_key = (current_dir, project_root_norm)
+        if lookup_key in _TSCONFIG_LOOKUP_CACHE:
+            result = _TSCONFIG_LOOKUP_CACHE[lookup_key]
+            break
+        visited_dirs.append(current_dir)
+        dir_config = _dir_config(current_dir)
+        if dir_config is not None:
+            config_path, data = dir_config
+            # Nearest config failed to parse (data is None): skip (as before) rather than use an outer one
+            result = (config_path, data) if data is not None else None
+            break
 
         if current_dir == project_root_norm or not current_dir.startswith(project_root_norm):
             break 
-        parent_dir = os.path.dirname(current_dir)
+        parent_dir = _dirname(current_dir)
         if parent_dir == current_dir: 
             break
         current_dir = parent_dir
-    logger.debug(f"No tsconfig.json or jsconfig.json found in hierarchy from {start_dir} up to {project_root_val}.")
-    return None
+    for visited_dir in visited_dirs:
+        _TSCONFIG_LOOKUP_CACHE[(visited_dir, project_root_norm)] = result
+    if result is None:
+        logger.debug(f"No usable tsconfig.json or jsconfig.json found in hierarchy from {start_dir} up to {project_root_val}.")
+    return result
+
+_ALIAS_TRIE_LEAF = "" # Trie nodes are keyed by single characters, so the empty string marks a wildcard alias ending here
+
+def _build_alias_trie(paths_from_config: Dict[str, Any]) -> Tuple[Dict[str, Tuple[int, List[str]]], Dict[str, Any]]:
+    """
+    Compiles tsconfig `paths` into (exact_aliases, wildcard_trie), memoized per paths object.
+    exact_aliases: {alias: (order, target_patterns)}. wildcard_trie: a character trie over the alias
+    prefixes ("@comp/*" -> "@comp") whose leaves hold (order, pattern bases without "/*").
+    Aliases that can never produce a target (no patterns / no "/*" patterns) are left out.
+    """
+    cached_entry = _ALIAS_TRIE_CACHE.get(id(paths_from_config))
+    if cached_entry is not None and cached_entry[0] is paths_from_config:
+        return cached_entry[1], cached_entry[2]
+    exact_aliases: Dict[str, Tuple[int, List[str]]] = {}
+    wildcard_trie: Dict[str, Any] = {}
+    for order, (alias, target_path_patterns) in enumerate(paths_from_config.items()):
+        if alias.endswith('/*'):
+            pattern_bases = [pattern[:-2] for pattern in target_path_patterns if pattern.endswith('/*')]
+            if not pattern_bases: continue
+            node = wildcard_trie
+            for ch in alias[:-2]:
+                node = node.setdefault(ch, {})
+            node[_ALIAS_TRIE_LEAF] = (order, pattern_bases)
+        elif target_path_patterns:
+            exact_aliases[alias] = (order, list(target_path_patterns))
+    _ALIAS_TRIE_CACHE[id(paths_from_config)] = (paths_from_config, exact_aliases, wildcard_trie)
+    return exact_aliases, wildcard_trie
+
+def _match_tsconfig_alias(import_path: str, paths_from_config: Dict[str, Any]) -> Optional[Tuple[List[str], str]]:
+    """
+    Returns (target_patterns, wildcard_part) for the first alias in `paths` order that matches import_path,
+    walking the wildcard trie once along the import string instead of scanning every alias.
+    A target is resolved as pattern + wildcard_part (wildcard_part is '' for exact aliases).
+    """
+    exact_aliases, wildcard_trie = _build_alias_trie(paths_from_config)
+    exact_entry = exact_aliases.get(import_path)
+    match: Optional[Tuple[int, List[str], str]] = (exact_entry[0], exact_entry[1], '') if exact_entry else None
+    node: Optional[Dict[str, Any]] = wildcard_trie
+    pos = 0
+    while node is not None:
+        leaf = node.get(_ALIAS_TRIE_LEAF)
+        if leaf is not None and (match is None or leaf[0] < match[0]):
+            match = (leaf[0], leaf[1], import_path[pos:])
+        if pos == len(import_path):
+            break
+        node = node.get(import_path[pos])
+        pos += 1
+    return (match[1], match[2]) if match else None
 
 # --- MODIFIED load_project_symbol_map ---
-@cached("project_symbol_map_data",
-        key_func=lambda: f"project_symbol_map:{os.path.getmtime(normalize_path(os.path.join(os.path.dirname(os.path.abspath(__import__('cline_utils.dependency_system.core.key_manager').__file__)), _PROJECT_SYMBOL_MAP_FILENAME_LOCAL))) if os.path.exists(normalize_path(os.path.join(os.path.dirname(os.path.abspath(__import__('cline_utils.dependency_system.core.key_manager').__file__)), _PROJECT_SYMBOL_MAP_FILENAME_LOCAL))) else 'missing'}")
+def _project_symbol_map_signature(map_path: str) -> Tuple[int, int]:
+    """(st_mtime_ns, st_size) of a symbol map JSON; the stamp a pickle sidecar must carry to be trusted."""
+    map_stat = os.stat(map_path)
+    return (map_stat.st_mtime_ns, map_stat.st_size)
+
+def _project_symbol_map_cache_key() -> str:
+    """Cache key for load_project_symbol_map: the JSON map's signature from a single stat, or 'missing'."""
+    try:
+        return f"project_symbol_map:{_project_symbol_map_signature(_PROJECT_SYMBOL_MAP_PATH)}"
+    except OSError:
+        return "project_symbol_map:missing"
+
+def write_project_symbol_map_sidecar(symbol_map: Dict[str, Dict[str, Any]], map_path: str, binary_path: str) -> None:
+    """
+    Writes the pickle sidecar for a just-saved project symbol map JSON, stamped with that JSON's
+    (st_mtime_ns, st_size). Written to a temp file and moved into place, so an interrupted dump
+    never leaves a truncated sidecar behind.
+    """
+    temp_path = f"{binary_path}.tmp"
+    try:
+        payload = {"json_signature": _project_symbol_map_signature(map_path), "symbols": symbol_map}
+        with open(temp_path, 'wb') as f:
+            pickle.dump(payload, f, protocol=5)
+        os.replace(temp_path, binary_path)
+        logger.debug(f"Saved binary symbol map sidecar: {binary_path}")
+    except (OSError, pickle.PicklingError) as e:
+        logger.warning(f"Could not write binary symbol map sidecar {binary_path}: {e}")
+        try: os.remove(temp_path)
+        except OSError: pass
+
+@cached("project_symbol_map_data", key_func=_project_symbol_map_cache_key)
 def load_project_symbol_map() -> Dict[str, Dict[str, Any]]:
     """
     Loads the project_symbol_map.json file.
     The map contains information about functions, classes, globals, and exports for each file.
     Keys are normalized absolute file paths.
     It assumes the map is stored in the same directory as key_manager.py.
+    The pickle sidecar is read instead of the JSON only when it is stamped with the JSON's exact
+    (st_mtime_ns, st_size); a restored or copied JSON falls back to parsing.
     """
     try:
-        # Determine path relative to key_manager.py
-        # Using __import__ and __file__ to robustly get key_manager's directory
-        key_manager_module = __import__('cline_utils.dependency_system.core.key_manager', fromlist=[''])
-        core_dir = os.path.dirname(os.path.abspath(key_manager_module.__file__))
-        map_path = normalize_path(os.path.join(core_dir, _PROJECT_SYMBOL_MAP_FILENAME_LOCAL))
-
-        if not os.path.exists(map_path):
+        map_path = _PROJECT_SYMBOL_MAP_PATH
+        try:
+            map_signature = _project_symbol_map_signature(map_path)
+        except OSError:
             logger.warning(f"Project symbol map file not found at {map_path}. Symbol verification will be skipped.")
             return {}
         
+        binary_path = _PROJECT_SYMBOL_MAP_BINARY_PATH
+        try:
+            with open(binary_path, 'rb') as f:
+                payload = pickle.load(f)
+            if isinstance(payload, dict) and payload.get("json_signature") == map_signature:
+                data = {sys.intern(path): symbols for path, symbols in payload["symbols"].items()}
+                logger.debug(f"Loaded project symbol map from binary sidecar: {binary_path} ({len(data)} entries)")
+                return data
+            logger.debug(f"Binary symbol map sidecar {binary_path} does not match {map_path}. Falling back to JSON.")
+        except FileNotFoundError:
+            pass
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError, AttributeError, ValueError) as e_bin:
+            logger.debug(f"Binary symbol map sidecar unavailable ({e_bin}). Falling back to JSON.")
+
         with open(map_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+            data = {sys.intern(path): symbols for path, symbols in json.load(f).items()}
         logger.debug(f"Successfully loaded project symbol map from: {map_path} ({len(data)} entries)")
         return data
     except json.JSONDecodeError as e:
@@ -160,13 +544,53 @@ def load_project_symbol_map() -> Dict[str, Dict[str, Any]]:
         logger.exception(f"Unexpected error loading project symbol map: {e}")
         return {}
 
+# --- Extension Dispatch ---
+# Each handler takes (norm_path, path_to_key_info, project_root, file_analysis, file_analysis_results,
+# project_symbol_map, threshold, context) and returns (char_suggestions, raw_ast_links).
+_SuggestResult = Tuple[List[Tuple[str, str]], List[ASTLink]]
+
+def _dispatch_python(norm_path, path_to_key_info, project_root, file_analysis, file_analysis_results, project_symbol_map, threshold, context) -> _SuggestResult:
+    # suggest_python_dependencies returns two lists (suggestions, AST links)
+    return suggest_python_dependencies(norm_path, path_to_key_info, project_root, file_analysis,
+                                       file_analysis_results, project_symbol_map, threshold, context=context)
+
+def _dispatch_js(norm_path, path_to_key_info, project_root, file_analysis, file_analysis_results, project_symbol_map, threshold, context) -> _SuggestResult:
+    # JS suggester expects the BIG map and gets the specific analysis internally. No structured AST links from JS for now.
+    return suggest_javascript_dependencies(norm_path, path_to_key_info, project_root,
+                                           file_analysis_results, project_symbol_map, threshold), []
+
+def _dispatch_doc(norm_path, path_to_key_info, project_root, file_analysis, file_analysis_results, project_symbol_map, threshold, context) -> _SuggestResult:
+    embeddings_dir = context.embeddings_dir_abs # Read once per run, not per doc file
+    metadata_path = os.path.join(embeddings_dir, "metadata.json")
+    return suggest_documentation_dependencies(norm_path, path_to_key_info, project_root, file_analysis_results,
+                                              threshold, embeddings_dir, metadata_path), []
+
+def _dispatch_html(norm_path, path_to_key_info, project_root, file_analysis, file_analysis_results, project_symbol_map, threshold, context) -> _SuggestResult:
+    return suggest_html_dependencies(norm_path, path_to_key_info, project_root, file_analysis_results, context), []
+
+def _dispatch_css(norm_path, path_to_key_info, project_root, file_analysis, file_analysis_results, project_symbol_map, threshold, context) -> _SuggestResult:
+    return suggest_css_dependencies(norm_path, path_to_key_info, project_root, file_analysis_results), []
+
+def _dispatch_generic(norm_path, path_to_key_info, project_root, file_analysis, file_analysis_results, project_symbol_map, threshold, context) -> _SuggestResult:
+    return suggest_generic_dependencies(norm_path, path_to_key_info, project_root, threshold), []
+
+_EXT_DISPATCH: Dict[str, Callable[..., _SuggestResult]] = {
+    '.py': _dispatch_python,
+    '.js': _dispatch_js, '.ts': _dispatch_js, '.tsx': _dispatch_js, '.mjs': _dispatch_js, '.cjs': _dispatch_js,
+    '.md': _dispatch_doc, '.rst': _dispatch_doc,
+    '.html': _dispatch_html, '.htm': _dispatch_html,
+    '.css': _dispatch_css,
+}
+
 # --- Main Dispatcher ---
 def suggest_dependencies(file_path: str,
                          path_to_key_info: Dict[str, KeyInfo], 
                          project_root: str,
                          file_analysis_results: Dict[str, Any], 
-                         threshold: float = 0.7
-                         ) -> Tuple[List[Tuple[str, str]], List[Dict[str, str]]]: # MODIFIED return type
+                         threshold: float = 0.7,
+                         context: Optional[SuggestionContext] = None,
+                         project_symbol_map: Optional[Dict[str, Dict[str, Any]]] = None
+                         ) -> Tuple[List[Tuple[str, str]], List[ASTLink]]: # MODIFIED return type
     """
     Suggest dependencies for a file, assigning appropriate characters, using contextual keys.
 
@@ -176,6 +600,8 @@ def suggest_dependencies(file_path: str,
         project_root: Root directory of the project
         file_analysis_results: Pre-computed analysis results for files
         threshold: Confidence threshold for *semantic* suggestions (0.0 to 1.0)
+        context: Run-wide SuggestionContext; built (and reused across calls) from path_to_key_info if omitted
+        project_symbol_map: Already-loaded symbol map; loaded from disk if omitted (batch callers load it once)
     Returns:
         List of (dependency_path, dependency_character) tuples
     """
@@ -194,94 +620,219 @@ def suggest_dependencies(file_path: str,
         logger.debug(f"No valid analysis result for {norm_path} in file_analysis_results map. Skipping suggestions for this file.")
         return [], [] # MODIFIED return
 
-    project_symbol_map = load_project_symbol_map()
+    if project_symbol_map is None:
+        project_symbol_map = load_project_symbol_map()
+    if context is None:
+        context = _get_suggestion_context(path_to_key_info, project_root)
     
-    # Initialize collectors
-    char_suggestions: List[Tuple[str, str]] = []
-    raw_ast_links_collector: List[Dict[str, str]] = [] # NEW: For Python AST links
-
-    if file_ext == '.py':
-        # suggest_python_dependencies now returns two lists
-        char_suggestions, py_ast_links = suggest_python_dependencies( # MODIFIED: Unpack two values
-            norm_path,                         
-            path_to_key_info,                  
-            project_root,                      
-            current_file_specific_analysis,    
-            file_analysis_results,             
-            project_symbol_map,                
-            threshold                          
-        )
-        raw_ast_links_collector.extend(py_ast_links) # NEW: Collect AST links
-
-    elif file_ext in ('.js', '.ts', '.tsx', '.mjs', '.cjs'):
-        # These other language suggesters (as per your provided file) expect
-        # file_analysis_results (the BIG map) and get the specific analysis internally.
-        char_suggestions = suggest_javascript_dependencies(
-            norm_path, 
-            path_to_key_info, 
-            project_root, 
-            file_analysis_results, # Pass the BIG map
-            project_symbol_map,    # It also takes project_symbol_map
-            threshold
-        )
-        # No structured AST links from JS for now
-
-    elif file_ext in ('.md', '.rst'):
-        config = ConfigManager()
-        embeddings_dir_rel = config.get_path("embeddings_dir", "cline_utils/dependency_system/analysis/embeddings")
-        embeddings_dir = normalize_path(os.path.join(project_root, embeddings_dir_rel))
-        metadata_path = os.path.join(embeddings_dir, "metadata.json")
-        char_suggestions = suggest_documentation_dependencies(
-            norm_path, 
-            path_to_key_info, 
-            project_root, 
-            file_analysis_results, # Pass the BIG map
-            threshold, 
-            embeddings_dir, 
-            metadata_path
-        )
-        # No AST links from Markdown
-
-    elif file_ext in ('.html', '.htm'):
-        char_suggestions = suggest_html_dependencies(
-            norm_path, 
-            path_to_key_info, 
-            project_root, 
-            file_analysis_results # Pass the BIG map
-        )
-        # No AST links from HTML
-
-    elif file_ext == '.css':
-        char_suggestions = suggest_css_dependencies(
-            norm_path, 
-            path_to_key_info, 
-            project_root, 
-            file_analysis_results # Pass the BIG map
-        )
-        # No AST links from CSS
-        
-    else: # Generic
-        char_suggestions = suggest_generic_dependencies(
-            norm_path, 
-            path_to_key_info, 
-            project_root, 
-            threshold
-        )
-        # No AST links from generic
-    
-    return char_suggestions, raw_ast_links_collector # MODIFIED return
+    handler = _EXT_DISPATCH.get(file_ext, _dispatch_generic)
+    return handler(norm_path, path_to_key_info, project_root,
+                   current_file_specific_analysis, file_analysis_results,
+                   project_symbol_map, threshold, context)
+
+# --- Batch Suggestion (process pool) ---
+# Per-worker shared inputs, seeded once by _init_suggestion_worker instead of being pickled per file.
+_BATCH_WORKER_STATE: Dict[str, Any] = {}
+
+def _init_suggestion_worker(path_to_key_info: Dict[str, KeyInfo], project_root: str,
+                            file_analysis_results: Dict[str, Any], threshold: float,
+                            python_asts: Dict[str, ast.AST],
+                            project_symbol_map: Dict[str, Dict[str, Any]],
+                            semantic_results: Dict[str, List[Tuple[str, str]]]) -> None:
+    """
+    Process-pool initializer: stores shared inputs, builds the run context and symbol index, seeds 'ast_cache'
+    and installs the batch's precomputed semantic suggestions (workers start from a fresh interpreter).
+    """
+    _BATCH_WORKER_STATE.update(path_to_key_info=path_to_key_info, project_root=project_root,
+                               file_analysis_results=file_analysis_results, threshold=threshold,
+                               project_symbol_map=project_symbol_map,
+                               context=_get_suggestion_context(path_to_key_info, project_root))
+    flatten_symbol_map(project_symbol_map)
+    if semantic_results:
+        _SEMANTIC_BATCH_RESULTS.update(key=(path_to_key_info, project_root, threshold), results=semantic_results)
+    ast_cache = cache_manager.get_cache("ast_cache")
+    for ast_path, tree in python_asts.items():
+        if ast_cache.get(ast_path) is None:
+            ast_cache.set(ast_path, tree)
+
+def _suggest_dependencies_worker(file_path: str) -> Tuple[List[Tuple[str, str]], List[ASTLink]]:
+    state = _BATCH_WORKER_STATE
+    return suggest_dependencies(file_path, state["path_to_key_info"], state["project_root"],
+                                state["file_analysis_results"], threshold=state["threshold"],
+                                context=state["context"], project_symbol_map=state["project_symbol_map"])
+
+# Semantic results precomputed by suggest_dependencies_batch for the files of the running batch (reset when it returns):
+# {"key": (path_to_key_info, project_root, threshold), "results": {norm_path: [(target_norm_path, char), ...]}}
+_SEMANTIC_BATCH_RESULTS: Dict[str, Any] = {"key": None, "results": {}}
+_SEMANTIC_BLOCK_ELEMENTS = 1 << 22 # Max (source rows x targets) scores materialized per GEMM block: 16 MB of float32
+
+def _semantic_suggestions_for_files(file_paths: List[str], path_to_key_info: Dict[str, KeyInfo],
+                                    project_root: str, threshold: float) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    Semantic suggestions for many files at once, equal to calling suggest_semantic_dependencies_path_based
+    for each. Sources are scored in blocks with one GEMM each (block rows @ matrix.T) instead of one GEMV
+    per file. Files not settled here (untracked paths, directories) are left out and handled per file.
+    """
+    context = _get_suggestion_context(path_to_key_info, project_root)
+    threshold_strong = context.semantic_strong_threshold
+    if min(threshold_strong, threshold) <= 0:
+        return {} # Missing embeddings would pass such thresholds; leave these runs to the per-file path
+    embeddings_dir_abs = context.embeddings_dir_abs
+    if not os.path.isdir(embeddings_dir_abs):
+        return {}
+    from .embedding_manager import get_embedding_matrix # Local import to avoid top-level circularity
+    row_of, matrix = get_embedding_matrix(embeddings_dir_abs, path_to_key_info, project_root)
+
+    # Targets in path_to_key_info order, as the per-file path lists them; -1 marks files without an embedding
+    target_infos = context.semantic_targets
+    position_of = context.semantic_target_position
+    target_rows = np.fromiter((row_of.get(key_str, -1) for key_str in context.semantic_target_keys), dtype=np.intp, count=len(target_infos))
+
+    results: Dict[str, List[Tuple[str, str]]] = {}
+    sources: List[Tuple[str, int, int]] = [] # (norm_path, matrix row, own position among the targets or -1)
+    for path in file_paths:
+        norm_path = normalize_path(path)
+        source_info = path_to_key_info.get(norm_path)
+        if not source_info or source_info.is_directory or norm_path in results:
+            continue
+        source_row = row_of.get(source_info.key_string)
+        if source_row is None or not matrix[source_row].any():
+            results[norm_path] = [] # Every score would be 0.0
+            continue
+        sources.append((norm_path, source_row, position_of.get(norm_path, -1)))
+    if not sources or not target_infos:
+        return results
+
+    has_row = target_rows >= 0
+    gather_rows = np.where(has_row, target_rows, 0)
+    block_size = max(1, _SEMANTIC_BLOCK_ELEMENTS // len(target_infos))
+    for block_start in range(0, len(sources), block_size):
+        block = sources[block_start:block_start + block_size]
+        source_rows = np.fromiter((source_row for _, source_row, _ in block), dtype=np.intp, count=len(block))
+        scores = (matrix[source_rows] @ matrix.T)[:, gather_rows]
+        confidences = np.where(has_row, np.clip(scores, 0.0, 1.0), np.float32(0.0))
+        confidences[target_rows[None, :] == source_rows[:, None]] = 1.0 # Same key string as the source
+        strong_mask = confidences >= threshold_strong
+        selected_mask = strong_mask | (confidences >= threshold)
+        for i, (norm_path, _, own_position) in enumerate(block):
+            if own_position >= 0:
+                selected_mask[i, own_position] = False
+            selected_idx = np.flatnonzero(selected_mask[i])
+            results[norm_path] = [(target_infos[idx].norm_path, 'S' if is_strong else 's')
+                                  for idx, is_strong in zip(selected_idx.tolist(), strong_mask[i, selected_idx].tolist())]
+    return results
+
+def _prepare_semantic_batch(file_paths: List[str], path_to_key_info: Dict[str, KeyInfo],
+                            project_root: str, threshold: float) -> None:
+    """
+    Loads the shared embedding matrix and precomputes the batch's semantic suggestions in this process, so forked
+    workers inherit both and the threaded fallback does not have several threads loading every .npy file at once.
+    """
+    try:
+        results = _semantic_suggestions_for_files(file_paths, path_to_key_info, project_root, threshold)
+    except Exception as e:
+        logger.warning(f"Could not precompute semantic suggestions for the batch ({type(e).__name__}: {e}). Computing them per file.")
+        return
+    _SEMANTIC_BATCH_RESULTS.update(key=(path_to_key_info, project_root, threshold), results=results)
+    logger.debug(f"Precomputed semantic suggestions for {len(results)} of {len(file_paths)} batch files.")
+
+def suggest_dependencies_batch(file_paths: List[str],
+                               path_to_key_info: Dict[str, KeyInfo],
+                               project_root: str,
+                               file_analysis_results: Dict[str, Any],
+                               threshold: float = 0.7,
+                               max_workers: Optional[int] = None,
+                               on_result: Optional[Callable[[int, Tuple[List[Tuple[str, str]], List[ASTLink]]], None]] = None
+                               ) -> List[Tuple[List[Tuple[str, str]], List[ASTLink]]]:
+    """
+    Runs suggest_dependencies for many files in a process pool.
+
+    Args:
+        file_paths: Paths of the files to suggest dependencies for
+        path_to_key_info: Global map from normalized paths to KeyInfo objects.
+        project_root: Root directory of the project
+        file_analysis_results: Pre-computed analysis results for files
+        threshold: Confidence threshold for *semantic* suggestions (0.0 to 1.0)
+        max_workers: Maximum worker processes (defaults to CPU count)
+        on_result: Optional callback, called as on_result(index, result) in file_paths order while the batch
+                   runs (e.g. for progress reporting)
+    Returns:
+        List of (char_suggestions, ast_links) tuples, in the same order as file_paths.
+        Falls back to a thread pool if the process pool fails, and to serial processing for a single file/worker.
+    The symbol map and the embedding matrix are loaded once for the whole batch, and the semantic suggestions of
+    all its files are computed up front with blocked matrix products. Workers are started with 'forkserver' (or
+    'spawn') rather than forked: by now this process has loaded the embedding model and run threaded BLAS, and
+    forking a multi-threaded process can deadlock. The shared inputs are pickled to each worker once, by the initializer.
+    """
+    project_symbol_map = load_project_symbol_map()
+    _PATH_KIND_CACHE.clear() # Path probes are only trusted within one batch; files may have changed since the last
+    _UNRESOLVED_JS_IMPORTS.clear()
+    _DIR_ENTRIES_CACHE.clear()
+    _JS_STEM_INDEX_CACHE.clear()
+    _prepare_semantic_batch(file_paths, path_to_key_info, project_root, threshold)
+    results: List[Tuple[List[Tuple[str, str]], List[ASTLink]]] = []
+    def _collect(result_iter: Iterable[Tuple[List[Tuple[str, str]], List[ASTLink]]]) -> None:
+        # Report each result as it arrives, not once the whole batch is done
+        for result in result_iter:
+            if on_result is not None:
+                on_result(len(results), result)
+            results.append(result)
+
+    try:
+        workers = max(1, min(max_workers or os.cpu_count() or 1, len(file_paths)))
+        if workers > 1:
+            ast_cache = cache_manager.get_cache("ast_cache")
+            python_asts: Dict[str, ast.AST] = {}
+            for path in file_paths:
+                if path.endswith('.py'):
+                    tree = ast_cache.get(normalize_path(path))
+                    if tree is not None:
+                        python_asts[normalize_path(path)] = tree
+            try:
+                start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method),
+                                         initializer=_init_suggestion_worker,
+                                         initargs=(path_to_key_info, project_root, file_analysis_results, threshold,
+                                                   python_asts, project_symbol_map, _SEMANTIC_BATCH_RESULTS["results"])) as executor:
+                    chunk_size = max(1, len(file_paths) // (workers * 4))
+                    _collect(executor.map(_suggest_dependencies_worker, file_paths, chunksize=chunk_size))
+                return results
+            except Exception as e:
+                logger.warning(f"Parallel dependency suggestion failed ({type(e).__name__}: {e}). "
+                               f"Falling back to threaded processing for the remaining {len(file_paths) - len(results)} files.")
+
+        remaining_paths = file_paths[len(results):] # Results already reported stay; only the rest are recomputed
+        context = _get_suggestion_context(path_to_key_info, project_root)
+        def _suggest_one(path: str) -> Tuple[List[Tuple[str, str]], List[ASTLink]]:
+            return suggest_dependencies(path, path_to_key_info, project_root, file_analysis_results, threshold=threshold,
+                                        context=context, project_symbol_map=project_symbol_map)
+        if workers > 1:
+            # The resolvers mostly wait on stat syscalls, which release the GIL. The shared inputs are read-only here,
+            # and the module caches only see single dict/set get/set operations, so a race at worst repeats a probe.
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                _collect(executor.map(_suggest_one, remaining_paths))
+        else:
+            _collect(map(_suggest_one, remaining_paths))
+        return results
+    finally:
+        _SEMANTIC_BATCH_RESULTS.update(key=None, results={})
+
 # --- Type-Specific Suggestion Functions ---
+
 def _identify_structural_dependencies(source_path: str, source_analysis: Dict[str, Any],
                                      path_to_key_info: Dict[str, KeyInfo], 
                                      project_root: str,
-                                     project_symbol_map: Dict[str, Dict[str, Any]] 
-                                     ) -> Tuple[List[Tuple[str, str]], List[Dict[str, str]]]:
+                                     project_symbol_map: Dict[str, Dict[str, Any]],
+                                     context: Optional[SuggestionContext] = None
+                                     ) -> Tuple[List[Tuple[str, str]], List[ASTLink]]:
     """
     Identifies Python structural dependencies (calls, attributes, inheritance) using contextual keys.
     Returns list of tuples (dependency_path, dependency_character).
     """
-    suggestions_path_based: List[Tuple[str, str]] = []
-    raw_ast_verified_links: List[Dict[str, str]] = [] # NEW: For collecting AST-derived links
+    suggestions_by_path: Dict[str, str] = {} # target path -> char, priority-merged as links are verified
+    raw_ast_verified_links: List[ASTLink] = [] # NEW: For collecting AST-derived links
+    # Debug messages are only formatted when DEBUG is enabled; the f-strings below run per reference otherwise.
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
 
     if not source_analysis: 
         return [], [] # MODIFIED return
@@ -294,11 +845,12 @@ def _identify_structural_dependencies(source_path: str, source_analysis: Dict[st
     exceptions_handled = source_analysis.get("exceptions_handled", []) # NEW
     with_contexts_used = source_analysis.get("with_contexts_used", []) # NEW
 
-    # Cache for _build_import_map results per source_path
-    if not hasattr(_identify_structural_dependencies, '_import_map_cache'):
-        _identify_structural_dependencies._import_map_cache = {} # type: ignore
-    if not hasattr(_identify_structural_dependencies, '_resolved_path_cache'):
-        _identify_structural_dependencies._resolved_path_cache = {} # type: ignore
+    # Nothing to resolve: skip building the import map (a full AST walk) for trivial/data-only modules
+    if not (calls or attributes or inheritance or type_references or
+            decorators_used or exceptions_handled or with_contexts_used):
+        return [], []
+    if context is None:
+        context = _get_suggestion_context(path_to_key_info, project_root)
 
     def _build_import_map(current_source_path: str) -> Dict[str, str]:
         """ 
@@ -313,8 +865,9 @@ def _identify_structural_dependencies(source_path: str, source_analysis: Dict[st
         - `from my_package.another_module import specific_item as si` -> map `{"si": "/abs/path/to/my_package/another_module.py"}`
         """
         norm_source_path = normalize_path(current_source_path)
-        if norm_source_path in _identify_structural_dependencies._import_map_cache: # type: ignore
-            return _identify_structural_dependencies._import_map_cache[norm_source_path] # type: ignore
+        cached_import_map = _IMPORT_MAP_CACHE.get(norm_source_path)
+        if cached_import_map is not None:
+            return cached_import_map
         
         local_import_map: Dict[str, str] = {} 
 
@@ -323,14 +876,17 @@ def _identify_structural_dependencies(source_path: str, source_analysis: Dict[st
         
         if not tree:
             logger.error(f"ImportMap: AST tree not found in 'ast_cache' for {norm_source_path}. Cannot build import map accurately. This may indicate a parsing failure during the analysis phase or a cache miss/eviction.")
-            _identify_structural_dependencies._import_map_cache[norm_source_path] = local_import_map 
+            _IMPORT_MAP_CACHE[norm_source_path] = local_import_map 
             return local_import_map # Return empty map if AST is not available
             
         try:
-            current_source_dir = os.path.dirname(norm_source_path)
+            # Local bindings for the per-import loops below
+            _dirname, _basename, _join = os.path.dirname, os.path.basename, os.path.join
+            norm_project_root = context.project_root_norm
+            current_source_dir = _dirname(norm_source_path)
             # project_root is available from the outer scope of _identify_structural_dependencies
             
-            for node in ast.walk(tree): # Iterate through the provided AST tree
+            for node in _iter_import_nodes(tree): # Same order as ast.walk, statements only
                 if isinstance(node, ast.Import):
                     for alias_node in node.names:
                         imported_module_string = alias_node.name 
@@ -343,15 +899,17 @@ def _identify_structural_dependencies(source_path: str, source_analysis: Dict[st
                             path_to_key_info=path_to_key_info,
                             project_symbol_map=project_symbol_map,
                             specific_item_name=None, 
-                            relative_level=0 
+                            relative_level=0,
+                            context=context
                         )
                         
                         if resolved_paths_info_list:
-                            resolved_module_file_path = normalize_path(resolved_paths_info_list[0][0])
+                            resolved_module_file_path = resolved_paths_info_list[0][0] # Already a normalized, tracked path
                             item_verified = resolved_paths_info_list[0][1] 
                             local_import_map[name_in_scope] = resolved_module_file_path
-                            logger.debug(f"ImportMap (ast.Import): Mapped '{name_in_scope}' to module path '{resolved_module_file_path}'. Item verified: {item_verified}")
-                        else:
+                            if debug_enabled:
+                                logger.debug(f"ImportMap (ast.Import): Mapped '{name_in_scope}' to module path '{resolved_module_file_path}'. Item verified: {item_verified}")
+                        elif debug_enabled:
                             logger.debug(f"ImportMap (ast.Import): Could not resolve module string '{imported_module_string}' (imported as '{name_in_scope}') from '{current_source_path}'.")
 
                 elif isinstance(node, ast.ImportFrom):
@@ -362,10 +920,10 @@ def _identify_structural_dependencies(source_path: str, source_analysis: Dict[st
                     if level > 0: # Only adjust base_dir if it's a relative import
                         temp_base = current_source_dir
                         for _ in range(level): 
-                            parent = os.path.dirname(temp_base)
-                            if not parent or parent == temp_base or not parent.startswith(normalize_path(project_root)):
+                            parent = _dirname(temp_base)
+                            if not parent or parent == temp_base or not parent.startswith(norm_project_root):
                                 logger.warning(f"Relative import level {level} for '{module_name_from_ast}' in '{current_source_path}' went too high or out of project. Resolution base fallback to project root.")
-                                temp_base = normalize_path(project_root) 
+                                temp_base = norm_project_root 
                             break
                         temp_base = parent
                         base_dir_for_relative_resolve = temp_base
@@ -377,49 +935,50 @@ def _identify_structural_dependencies(source_path: str, source_analysis: Dict[st
                         path_to_key_info=path_to_key_info,
                         project_symbol_map=project_symbol_map,
                         specific_item_name=None, 
-                        relative_level=level 
+                        relative_level=level,
+                        context=context
                         )
 
                     if module_resolved_paths_info_list:
-                        resolved_module_file_path = normalize_path(module_resolved_paths_info_list[0][0])
-                        module_symbols = project_symbol_map.get(resolved_module_file_path, {})
+                        resolved_module_file_path = module_resolved_paths_info_list[0][0] # Already a normalized, tracked path
+                        module_defined_names = _module_symbol_index(project_symbol_map, resolved_module_file_path).all_names
 
                         for alias in node.names:
                             item_name_actually_imported = alias.name 
                             name_in_scope = alias.asname or alias.name 
                             
                             # Verify if item_name_actually_imported exists in resolved_module_file_path's symbols
-                            is_defined_in_module_symbols = any(f.get('name') == item_name_actually_imported for f in module_symbols.get("functions", [])) or \
-                                                         any(c.get('name') == item_name_actually_imported for c in module_symbols.get("classes", [])) or \
-                                                         any(g.get('name') == item_name_actually_imported for g in module_symbols.get("globals_defined", []))
+                            is_defined_in_module_symbols = item_name_actually_imported in module_defined_names
                             
                             is_submodule_or_package = False
                             if not is_defined_in_module_symbols: 
                                 # If not a direct symbol, check if it's a submodule/package re-exported
                                 # by an __init__.py, and if that submodule/package is tracked.
-                                if os.path.basename(resolved_module_file_path) == "__init__.py":
-                                    package_dir_for_submodule_check = os.path.dirname(resolved_module_file_path)
-                                    potential_submodule_path_py = normalize_path(os.path.join(package_dir_for_submodule_check, item_name_actually_imported + ".py"))
-                                    potential_subpackage_path_init = normalize_path(os.path.join(package_dir_for_submodule_check, item_name_actually_imported, "__init__.py"))
+                                if _basename(resolved_module_file_path) == "__init__.py":
+                                    package_dir_for_submodule_check = _dirname(resolved_module_file_path)
+                                    potential_submodule_path_py = normalize_path(_join(package_dir_for_submodule_check, item_name_actually_imported + ".py"))
+                                    potential_subpackage_path_init = normalize_path(_join(package_dir_for_submodule_check, item_name_actually_imported, "__init__.py"))
                                 
                                     if potential_submodule_path_py in path_to_key_info or \
                                        potential_subpackage_path_init in path_to_key_info:
                                         is_submodule_or_package = True
-                                        logger.debug(f"ImportMap: Item '{item_name_actually_imported}' (imported as '{name_in_scope}') from module '{module_name_from_ast}' appears to be a tracked submodule/package within '{package_dir_for_submodule_check}'.")
+                                        if debug_enabled:
+                                            logger.debug(f"ImportMap: Item '{item_name_actually_imported}' (imported as '{name_in_scope}') from module '{module_name_from_ast}' appears to be a tracked submodule/package within '{package_dir_for_submodule_check}'.")
 
                             local_import_map[name_in_scope] = resolved_module_file_path
                             
                             if is_defined_in_module_symbols or is_submodule_or_package:
-                                logger.debug(f"ImportMap (ast.ImportFrom): Mapped '{name_in_scope}' (item '{item_name_actually_imported}') to module '{resolved_module_file_path}' (verified in symbols or as tracked submodule).")
-                            else:
+                                if debug_enabled:
+                                    logger.debug(f"ImportMap (ast.ImportFrom): Mapped '{name_in_scope}' (item '{item_name_actually_imported}') to module '{resolved_module_file_path}' (verified in symbols or as tracked submodule).")
+                            elif debug_enabled:
                                 logger.debug(f"ImportMap (ast.ImportFrom): Item '{item_name_actually_imported}' (imported as '{name_in_scope}') from module '{module_name_from_ast}' (path '{resolved_module_file_path}') not directly verified in its symbols or as a tracked submodule. Mapping to module path as fallback.")
-                    else:
+                    elif debug_enabled:
                         logger.debug(f"ImportMap: Module '{module_name_from_ast}' (level {level}) itself could not be resolved from '{current_source_path}'. Items like '{', '.join(a.name for a in node.names)}' not mapped.")
                                 
         except Exception as e: 
             logger.error(f"Error building import map for {norm_source_path} using AST: {e}", exc_info=False)
         
-        _identify_structural_dependencies._import_map_cache[norm_source_path] = local_import_map # type: ignore
+        _IMPORT_MAP_CACHE[norm_source_path] = local_import_map
         return local_import_map
 
     current_file_import_map = _build_import_map(source_path)
@@ -427,12 +986,15 @@ def _identify_structural_dependencies(source_path: str, source_analysis: Dict[st
     def _resolve_name_to_path(name_to_resolve: Optional[str]) -> Optional[str]: 
         if not name_to_resolve: 
             return None
+        # Builtins and implicit receivers short-circuit unless shadowed by an import in this file.
+        if name_to_resolve in _NEVER_RESOLVABLE and name_to_resolve not in current_file_import_map:
+            return None
         
         # Use a cache specific to this run of _identify_structural_dependencies for this source_path
         # The cache key should remain the same as it's for the (source_path, name_to_resolve) pair.
         cache_key_res = (source_path, name_to_resolve) 
-        if cache_key_res in _identify_structural_dependencies._resolved_path_cache: # type: ignore
-            return _identify_structural_dependencies._resolved_path_cache[cache_key_res] # type: ignore
+        if cache_key_res in _RESOLVED_PATH_CACHE:
+            return _RESOLVED_PATH_CACHE[cache_key_res]
         
         parts = name_to_resolve.split('.')
         resolved_module_path_val: Optional[str] = None
@@ -449,7 +1011,8 @@ def _identify_structural_dependencies(source_path: str, source_analysis: Dict[st
                 # Ensure the path from the import map is a tracked file
                 if path_from_import_map in path_to_key_info:
                     resolved_module_path_val = path_from_import_map
-                    logger.debug(f"_resolve_name_to_path: Resolved prefix '{current_prefix_to_check}' (from '{name_to_resolve}') to module path '{resolved_module_path_val}' via import map.")
+                    if debug_enabled:
+                        logger.debug(f"_resolve_name_to_path: Resolved prefix '{current_prefix_to_check}' (from '{name_to_resolve}') to module path '{resolved_module_path_val}' via import map.")
                     break # Found the longest matching prefix that's an imported module
                 else:
                     # This case should be rare if _build_import_map only stores paths present in path_to_key_info
@@ -459,173 +1022,101 @@ def _identify_structural_dependencies(source_path: str, source_analysis: Dict[st
             # If no prefix was found in the import map, it means the name_to_resolve
             # was not from an import statement (e.g., it's a local variable, global in current file, or built-in).
             # In this context, for finding *external module dependencies*, we return None.
-            logger.debug(f"_resolve_name_to_path: Name '{name_to_resolve}' or its prefixes not found in import map for '{source_path}'. Assumed local or built-in.")
+            if debug_enabled:
+                logger.debug(f"_resolve_name_to_path: Name '{name_to_resolve}' or its prefixes not found in import map for '{source_path}'. Assumed local or built-in.")
 
-        _identify_structural_dependencies._resolved_path_cache[cache_key_res] = resolved_module_path_val # type: ignore
+        _RESOLVED_PATH_CACHE[cache_key_res] = resolved_module_path_val
         return resolved_module_path_val
     
-    # --- MODIFIED: Process Calls and Attributes with symbol verification ---
-    for call_item in calls:
-        potential_source_str = call_item.get("potential_source") # e.g., "my_module_alias" or "my_module_alias.class_name"
-        target_name_str = call_item.get("target_name")           # e.g., "my_module_alias.method_name" or "ImportedClass()"
-        
-        target_path_val = _resolve_name_to_path(potential_source_str or target_name_str) # Try potential_source first
-
-        if target_path_val and target_path_val != source_path:
-            # Determine the actual item name being called/accessed on the target_path_val
-            actual_item_name_to_check = ""
-            if target_name_str: # "my_module_alias.method_name" -> "method_name"
-                # If potential_source_str resolved, target_name_str is likely the full path to the method/function
-                # We need the part of target_name_str that is relative to the resolved module (target_path_val)
-                # This can be complex if target_name_str is like module.class.method
-                # For now, simple split:
-                parts = target_name_str.split('.')
-                if len(parts) > 1 and ".".join(parts[:-1]) == potential_source_str : # my_alias.item -> item
-                     actual_item_name_to_check = parts[-1]
-                elif not potential_source_str : # direct call of an imported name
-                     actual_item_name_to_check = target_name_str.split('.')[0] # if target_name_str itself is dotted
-                else: # Fallback or if potential_source_str is the same as target_name_str (e.g. direct function call)
-                     actual_item_name_to_check = target_name_str.split('.')[-1]
-
-
-            if actual_item_name_to_check:
-                # Remove "()" if it's a call representation from _get_full_name_str
-                if actual_item_name_to_check.endswith("()"):
-                    actual_item_name_to_check = actual_item_name_to_check[:-2]
-
-                module_symbols = project_symbol_map.get(target_path_val, {})
-                is_verified = any(s_item.get('name') == actual_item_name_to_check for s_list_key in ["functions", "classes", "globals_defined"] for s_item in module_symbols.get(s_list_key, []))
-                
-                # Heuristic: if it's a class method call like MyClass.method(), check if MyClass is in symbols,
-                # but we don't have easy access to method names within classes in project_symbol_map yet.
-                # For now, if potential_source (e.g., MyClass) is a class in target_path_val, assume method call is valid.
-                if not is_verified and potential_source_str:
-                    potential_class_name = potential_source_str.split('.')[-1]
-                    if any(c.get('name') == potential_class_name for c in module_symbols.get("classes", [])):
-                        is_verified = True # Assume valid method call if the class itself is verified
-                        logger.debug(f"StructuralDep/Call: Assuming valid method call '{actual_item_name_to_check}' on verified class '{potential_class_name}' from {target_path_val}")
-
-
-                if is_verified:
-                    dep_char = "<"
-                    suggestions_path_based.append((target_path_val, dep_char))
-                    raw_ast_verified_links.append({
-                        "source_path": source_path, "target_path": target_path_val,
-                        "char": dep_char, "reason": f"Call/{target_name_str or potential_source_str}"
-                    })
-                    logger.debug(f"StructuralDep/Call: Verified {source_path} < uses '{target_name_str or potential_source_str}' from {target_path_val}")
-                else:
-                    logger.debug(f"StructuralDep/Call: Item '{actual_item_name_to_check}' (from call '{target_name_str}') not verified in symbols of '{target_path_val}'.")
-            else:
-                logger.debug(f"StructuralDep/Call: Could not determine specific item for call '{target_name_str}' with potential source '{potential_source_str}' resolved to '{target_path_val}'.")
-
-
-    for attr_item in attributes:
-        potential_source_str = attr_item.get("potential_source") # e.g., "my_module_alias" or "my_module_alias.instance"
-        attribute_name_accessed = attr_item.get("target_name")   # e.g., "some_attribute"
-        
-        target_path_val = _resolve_name_to_path(potential_source_str)
-
-        if target_path_val and target_path_val != source_path and attribute_name_accessed:
-            module_symbols = project_symbol_map.get(target_path_val, {})
-            
-            # Check if the attribute_name_accessed is a global/function/class directly in the module
-            is_verified = any(s_item.get('name') == attribute_name_accessed for s_list_key in ["functions", "classes", "globals_defined"] for s_item in module_symbols.get(s_list_key, []))
-            
-            # Heuristic: if potential_source_str (e.g., MyClass or my_instance_of_MyClass) resolves to a class,
-            # we assume the attribute access is valid for now (we don't have instance/class attributes in project_symbol_map easily).
-            if not is_verified and potential_source_str:
-                potential_class_name_from_source = potential_source_str.split('.')[-1]
-                if any(c.get('name') == potential_class_name_from_source for c in module_symbols.get("classes", [])):
-                    is_verified = True # Assume valid attribute access if the base object is a known class
-                    logger.debug(f"StructuralDep/Attribute: Assuming valid attribute '{attribute_name_accessed}' access on object/class '{potential_source_str}' (resolved to class in {target_path_val})")
-
-            if is_verified:
-                dep_char = "<"
-                suggestions_path_based.append((target_path_val, dep_char))
-                raw_ast_verified_links.append({
-                    "source_path": source_path, "target_path": target_path_val,
-                    "char": dep_char, "reason": f"Attribute/{potential_source_str}.{attribute_name_accessed}"
-                })
-                logger.debug(f"StructuralDep/Attribute: Verified {source_path} < uses attribute '{attribute_name_accessed}' from source '{potential_source_str}' (module: {target_path_val})")
-            else:
-                logger.debug(f"StructuralDep/Attribute: Attribute '{attribute_name_accessed}' from source '{potential_source_str}' not directly verified as defined symbol in '{target_path_val}'.")
-    # --- END OF MODIFIED Process Calls and Attributes ---
-
-    # Process Inheritance (from your last provided snippet, with raw_ast_links addition)
-    for inh_item in inheritance: 
-        base_class_name_str = inh_item.get("base_class_name") 
-        target_path_val = _resolve_name_to_path(base_class_name_str) 
-        if target_path_val and target_path_val != source_path:
-            # Verify "Base" is in target_path_val's symbols
-            module_symbols = project_symbol_map.get(target_path_val, {})
-            actual_class_name = base_class_name_str.split('.')[-1] if '.' in base_class_name_str else base_class_name_str
-            if any(c['name'] == actual_class_name for c in module_symbols.get("classes", [])):
-                dep_char = "<"
-                suggestions_path_based.append((target_path_val, dep_char))
-                raw_ast_verified_links.append({
-                    "source_path": source_path, "target_path": target_path_val,
-                    "char": dep_char, "reason": f"Inheritance/{actual_class_name}"
-                })
-                logger.debug(f"StructuralDep/Inheritance: Verified {source_path} < inherits '{actual_class_name}' from {target_path_val}")
-            else:
-                logger.debug(f"StructuralDep/Inheritance: Base class '{actual_class_name}' (from '{base_class_name_str}') not found in symbols of resolved module '{target_path_val}'. Skipping dep suggestion for this inheritance.")
-
-    # --- MODIFIED: Process Type References with symbol map verification ---
-    for type_ref_item in type_references:
-        type_name_str = type_ref_item.get("type_name_str") # e.g., "MyType" or "other_module.TheirType"
-        target_path_val = _resolve_name_to_path(type_name_str) # Resolves "other_module" part if present
-        
-        if target_path_val and target_path_val != source_path:
-            # Verify the actual type (e.g., "TheirType") is defined in the resolved module
-            module_symbols = project_symbol_map.get(target_path_val, {})
-            actual_type_to_check = type_name_str.split('.')[-1] if '.' in type_name_str else type_name_str
-            is_defined_type = any(c['name'] == actual_type_to_check for c in module_symbols.get("classes", [])) or \
-                              any(f['name'] == actual_type_to_check for f in module_symbols.get("functions", [])) or \
-                              any(g['name'] == actual_type_to_check for g in module_symbols.get("globals_defined", []))
-            if is_defined_type: 
-                if any(c['name'] == actual_type_to_check for c in module_symbols.get("classes", [])): # Prioritize classes for type hints
-                    dep_char = "<"
-                    suggestions_path_based.append((target_path_val, dep_char))
-                    raw_ast_verified_links.append({
-                        "source_path": source_path, "target_path": target_path_val,
-                        "char": dep_char, "reason": f"TypeHint/{actual_type_to_check}"
-                    })
-                    logger.debug(f"StructuralDep/TypeHint: Verified {source_path} < uses type '{actual_type_to_check}' from {target_path_val}")
-            else:
-                logger.debug(f"StructuralDep/TypeHint: Type '{actual_type_to_check}' (from '{type_name_str}') not found in symbols of resolved module '{target_path_val}'. Skipping dep suggestion.")
-
-    # --- Process Decorators, Exceptions, With-Contexts with symbol map verification ---
+    # --- Collect pending structural items grouped by resolved target module ---
+    # Each entry: (item_name, class_hint, classes_only, dep_char, reason, log_name)
+    # - class_hint: for calls/attributes, the object the item is accessed on; if it is a class
+    #   defined in the target, the access is assumed valid (method/attribute names are not in the map).
+    # - classes_only: item must be a class in the target (inheritance, type hints).
+    pending: Dict[str, List[Tuple[str, Optional[str], bool, str, str, str]]] = defaultdict(list)
     item_categories_to_process = [
         (decorators_used, "Decorator", "<"),       # Using a decorator from another module means current file depends on it.
         (exceptions_handled, "Exception", "<"),    # Handling an exception from another module.
         (with_contexts_used, "WithContext", "<")   # Using a context manager from another module.
     ]
-    for item_list, item_type_log_name, dep_char in item_categories_to_process:
-        for item_entry in item_list:
-            # 'name' for decorators, 'type_name_str' for exceptions, 'context_expr_str' for with
-            item_name_str = item_entry.get("name") or item_entry.get("type_name_str") or item_entry.get("context_expr_str")
-            if not item_name_str: continue
-            target_path_val = _resolve_name_to_path(item_name_str)
-            if target_path_val and target_path_val != source_path:
-                module_symbols = project_symbol_map.get(target_path_val, {})
-                actual_item_to_check = item_name_str.split('.')[-1] if '.' in item_name_str else item_name_str
-
-                # Check if the item exists as any kind of defined symbol in the target module
-                is_defined_symbol = any(c['name'] == actual_item_to_check for c in module_symbols.get("classes", [])) or \
-                                    any(f['name'] == actual_item_to_check for f in module_symbols.get("functions", [])) or \
-                                    any(g['name'] == actual_item_to_check for g in module_symbols.get("globals_defined", []))
-                if is_defined_symbol:
-                    suggestions_path_based.append((target_path_val, dep_char))
-                    raw_ast_verified_links.append({
-                        "source_path": source_path, "target_path": target_path_val,
-                        "char": dep_char, "reason": f"{item_type_log_name}/{actual_item_to_check}"
-                    })
-                    logger.debug(f"StructuralDep/{item_type_log_name}: Verified {source_path} {dep_char} uses '{actual_item_to_check}' from {target_path_val}")
-                else:
-                    logger.debug(f"StructuralDep/{item_type_log_name}: Item '{actual_item_to_check}' (from '{item_name_str}') not found in symbols of resolved module '{target_path_val}'. Skipping dep suggestion.")
 
-    return list(set(suggestions_path_based)), raw_ast_verified_links
+    def _iter_structural_refs():
+        """Yields one normalized (log_name, name_to_resolve, item_name, class_hint, classes_only, dep_char, reason) per reference."""
+        for call_item in calls:
+            potential_source_str = call_item.get("potential_source") # e.g., "my_module_alias" or "my_module_alias.class_name"
+            target_name_str = call_item.get("target_name")           # e.g., "my_module_alias.method_name" or "ImportedClass()"
+            class_hint = potential_source_str.rpartition('.')[2] if potential_source_str else None
+            # The analyzer records the invoked item's bare name (e.g. "my_module_alias.method_name()" -> "method_name")
+            yield ("Call", potential_source_str or target_name_str, call_item.get("item_name"), class_hint, False, "<",
+                   f"Call/{target_name_str or potential_source_str}")
+        for attr_item in attributes:
+            potential_source_str = attr_item.get("potential_source") # e.g., "my_module_alias" or "my_module_alias.instance"
+            attribute_name_accessed = attr_item.get("target_name")   # e.g., "some_attribute"
+            if not potential_source_str or not attribute_name_accessed: continue
+            yield ("Attribute", potential_source_str, attribute_name_accessed, potential_source_str.rpartition('.')[2], False, "<",
+                   f"Attribute/{potential_source_str}.{attribute_name_accessed}")
+        # Inheritance and type hints (e.g. "other_module.TheirType") must name a class in the target module.
+        for log_name, ref_list, name_field in (("Inheritance", inheritance, "base_class_name"),
+                                               ("TypeHint", type_references, "type_name_str")):
+            for ref_item in ref_list:
+                ref_name_str = ref_item.get(name_field)
+                if not ref_name_str: continue
+                actual_class_name = ref_name_str.rpartition('.')[2]
+                yield (log_name, ref_name_str, actual_class_name, None, True, "<", f"{log_name}/{actual_class_name}")
+        for item_list, item_type_log_name, dep_char in item_categories_to_process:
+            for item_entry in item_list:
+                # 'name' for decorators, 'type_name_str' for exceptions, 'context_expr_str' for with
+                item_name_str = item_entry.get("name") or item_entry.get("type_name_str") or item_entry.get("context_expr_str")
+                if not item_name_str: continue
+                actual_item_to_check = item_name_str.rpartition('.')[2]
+                yield (item_type_log_name, item_name_str, actual_item_to_check, None, False, dep_char,
+                       f"{item_type_log_name}/{actual_item_to_check}")
+
+    # Repeated references (same call/attribute/type used many times) yield identical suggestions; resolve each once.
+    seen_item_keys: set = set()
+    for structural_ref in _iter_structural_refs():
+        if structural_ref in seen_item_keys: continue
+        seen_item_keys.add(structural_ref)
+        log_name, name_to_resolve, item_name, class_hint, classes_only, dep_char, reason = structural_ref
+        target_path_val = _resolve_name_to_path(name_to_resolve)
+        if not target_path_val or target_path_val == source_path:
+            continue
+        if not item_name:
+            if debug_enabled:
+                logger.debug(f"StructuralDep/{log_name}: Could not determine specific item for '{name_to_resolve}' resolved to '{target_path_val}'.")
+            continue
+        pending[target_path_val].append((item_name, class_hint, classes_only, dep_char, reason, log_name))
+
+    # --- Verify all pending items against each target module's symbol index in one pass ---
+    # Without a symbol map (e.g. first run) nothing can be verified; the resolved module path alone is used.
+    # Hot loop: bind lookups to locals.
+    verify_symbols = bool(project_symbol_map)
+    get_priority = ConfigManager().get_char_priority
+    append_link = raw_ast_verified_links.append
+    for target_path_val, items in pending.items():
+        target_index = _module_symbol_index(project_symbol_map, target_path_val) if verify_symbols else _EMPTY_SYMBOL_INDEX
+        all_names, class_names = target_index.all_names, target_index.classes
+        current_char = suggestions_by_path.get(target_path_val)
+        for item_name, class_hint, classes_only, dep_char, reason, log_name in items:
+            if not verify_symbols:
+                is_verified = True
+            elif classes_only:
+                is_verified = item_name in class_names
+            else:
+                # Heuristic: if the item is accessed on a class defined in the target (e.g. MyClass.method),
+                # assume it is valid; method/attribute names within classes are not in the symbol map yet.
+                is_verified = item_name in all_names or (class_hint is not None and class_hint in class_names)
+            if is_verified:
+                current_char = _merge_char(current_char, dep_char, get_priority)
+                append_link(ASTLink(source_path, target_path_val, dep_char, reason))
+                if debug_enabled:
+                    logger.debug(f"StructuralDep/{log_name}: Verified {source_path} {dep_char} uses '{item_name}' from {target_path_val}")
+            elif debug_enabled:
+                logger.debug(f"StructuralDep/{log_name}: Item '{item_name}' not found in symbols of resolved module '{target_path_val}'. Skipping dep suggestion.")
+        if current_char is not None:
+            suggestions_by_path[target_path_val] = current_char
+
+    return list(suggestions_by_path.items()), raw_ast_verified_links
 
 def suggest_python_dependencies(
     file_path: str, 
@@ -634,13 +1125,16 @@ def suggest_python_dependencies(
     source_analysis: Dict[str, Any],             # MODIFIED: This is now the specific analysis for file_path
     _all_file_analyses_map: Dict[str, Any],      # MODIFIED: This is the full map of all file analyses
     project_symbol_map: Dict[str, Dict[str, Any]], 
-    threshold: float
-) -> Tuple[List[Tuple[str, str]], List[Dict[str, str]]]: # MODIFIED return type
+    threshold: float,
+    context: Optional[SuggestionContext] = None
+) -> Tuple[List[Tuple[str, str]], List[ASTLink]]: # MODIFIED return type
     norm_file_path = normalize_path(file_path)
     # source_analysis is already the specific analysis for norm_file_path
     if source_analysis is None or "error" in source_analysis or "skipped" in source_analysis: 
         logger.debug(f"No valid analysis for {norm_file_path}, skipping Python suggestions.")
         return [], [] # MODIFIED return
+    if context is None:
+        context = _get_suggestion_context(path_to_key_info, project_root)
 
     explicit_deps_paths, explicit_raw_ast_links = _identify_python_dependencies(
         norm_file_path, 
@@ -648,18 +1142,20 @@ def suggest_python_dependencies(
         _all_file_analyses_map, 
         project_root, 
         path_to_key_info, 
-        project_symbol_map
+        project_symbol_map,
+        context
     )
     structural_suggestions_paths, structural_raw_ast_links = _identify_structural_dependencies(
         norm_file_path, 
         source_analysis, 
         path_to_key_info, 
         project_root, 
-        project_symbol_map
+        project_symbol_map,
+        context
     )
     semantic_suggestions_paths = suggest_semantic_dependencies_path_based(norm_file_path, path_to_key_info, project_root, threshold)
 
-    all_suggestions_paths = explicit_deps_paths + structural_suggestions_paths + semantic_suggestions_paths
+    all_suggestions_paths = chain(explicit_deps_paths, structural_suggestions_paths, semantic_suggestions_paths)
     
     # Combine all raw AST links
     all_raw_ast_links = explicit_raw_ast_links + structural_raw_ast_links # NEW
@@ -667,15 +1163,16 @@ def suggest_python_dependencies(
     # Apply priority to character-based suggestions
     combined_suggestions = _combine_suggestions_path_based_with_char_priority(all_suggestions_paths, norm_file_path)
 
-    if combined_suggestions:
-        logger.debug(f"Final Combined Dependencies for {norm_file_path}:")
-        for target_path, char_code in combined_suggestions:
-            logger.debug(f"  -> {target_path} ({char_code})")
-    else:
-        logger.debug(f"No combined dependencies found for {norm_file_path}.")
+    if logger.isEnabledFor(logging.DEBUG): # One line per dependency; skip the formatting entirely otherwise
+        if combined_suggestions:
+            logger.debug(f"Final Combined Dependencies for {norm_file_path}:")
+            for target_path, char_code in combined_suggestions:
+                logger.debug(f"  -> {target_path} ({char_code})")
+        else:
+            logger.debug(f"No combined dependencies found for {norm_file_path}.")
 
-    if all_raw_ast_links:
-        logger.debug(f"Raw AST-Verified Links Collected for {norm_file_path}: {len(all_raw_ast_links)} links")
+        if all_raw_ast_links:
+            logger.debug(f"Raw AST-Verified Links Collected for {norm_file_path}: {len(all_raw_ast_links)} links")
     
     return combined_suggestions, all_raw_ast_links
 
@@ -703,8 +1200,11 @@ def suggest_javascript_dependencies(file_path: str, path_to_key_info: Dict[str,
         tsconfig_info 
     )
     semantic_suggestions_paths = suggest_semantic_dependencies_path_based(norm_file_path, path_to_key_info, project_root, threshold)
+    # Either source alone is already one suggestion per target (never the file itself); only both together need combining
+    if not explicit_deps_paths or not semantic_suggestions_paths:
+        return list(explicit_deps_paths or semantic_suggestions_paths)
     
-    all_suggestions_paths = explicit_deps_paths + semantic_suggestions_paths
+    all_suggestions_paths = chain(explicit_deps_paths, semantic_suggestions_paths)
     return _combine_suggestions_path_based_with_char_priority(all_suggestions_paths, norm_file_path)
 
 def suggest_documentation_dependencies(file_path: str, path_to_key_info: Dict[str, KeyInfo], 
@@ -717,22 +1217,26 @@ def suggest_documentation_dependencies(file_path: str, path_to_key_info: Dict[st
 
     explicit_deps_paths = _identify_markdown_dependencies(norm_file_path, analysis, file_analysis_results, project_root, path_to_key_info)
     semantic_suggestions_paths = suggest_semantic_dependencies_path_based(norm_file_path, path_to_key_info, project_root, threshold)
+    # Either source alone is already one suggestion per target (never the file itself); only both together need combining
+    if not explicit_deps_paths or not semantic_suggestions_paths:
+        return list(explicit_deps_paths or semantic_suggestions_paths)
 
-    all_suggestions_paths = explicit_deps_paths + semantic_suggestions_paths
+    all_suggestions_paths = chain(explicit_deps_paths, semantic_suggestions_paths)
     return _combine_suggestions_path_based_with_char_priority(all_suggestions_paths, norm_file_path)
 
 def suggest_html_dependencies(file_path: str, path_to_key_info: Dict[str, KeyInfo], 
-                              project_root: str, file_analysis_results: Dict[str, Any]
+                              project_root: str, file_analysis_results: Dict[str, Any],
+                              context: Optional[SuggestionContext] = None
                               ) -> List[Tuple[str, str]]: # Output: List[(target_norm_path, char)]
     norm_file_path = normalize_path(file_path)
     analysis = file_analysis_results.get(norm_file_path)
     if analysis is None or "error" in analysis or "skipped" in analysis: return []
     
-    explicit_deps_paths = _identify_html_dependencies(norm_file_path, analysis, file_analysis_results, project_root, path_to_key_info)
+    explicit_deps_paths = _identify_html_dependencies(norm_file_path, analysis, file_analysis_results, project_root, path_to_key_info, context)
     # Optionally add semantic for HTML if meaningful:
     # semantic_suggestions_paths = suggest_semantic_dependencies_path_based(norm_file_path, path_to_key_info, project_root, some_html_threshold)
     # all_suggestions_paths = explicit_deps_paths + semantic_suggestions_paths
-    return _combine_suggestions_path_based_with_char_priority(explicit_deps_paths, norm_file_path)
+    return explicit_deps_paths # One 'd' per target, never the file itself: already combined
 
 def suggest_css_dependencies(file_path: str, path_to_key_info: Dict[str, KeyInfo], 
                              project_root: str, file_analysis_results: Dict[str, Any]
@@ -742,94 +1246,109 @@ def suggest_css_dependencies(file_path: str, path_to_key_info: Dict[str, KeyInfo
     if analysis is None or "error" in analysis or "skipped" in analysis: return []
 
     explicit_deps_paths = _identify_css_dependencies(norm_file_path, analysis, file_analysis_results, project_root, path_to_key_info)
-    return _combine_suggestions_path_based_with_char_priority(explicit_deps_paths, norm_file_path)
+    return explicit_deps_paths # One '<' per target, never the file itself: already combined
 
 def suggest_generic_dependencies(file_path: str, path_to_key_info: Dict[str, KeyInfo], 
                                  project_root: str, threshold: float) -> List[Tuple[str, str]]: # Output: List[(target_norm_path, char)]
     norm_file_path = normalize_path(file_path)
     semantic_suggestions_paths = suggest_semantic_dependencies_path_based(norm_file_path, path_to_key_info, project_root, threshold)
-    return _combine_suggestions_path_based_with_char_priority(semantic_suggestions_paths, norm_file_path)
+    return list(semantic_suggestions_paths) # One suggestion per target, never the file itself: nothing to combine
 
 # --- Semantic Suggestion (Adapted to return paths) ---
 def suggest_semantic_dependencies_path_based(file_path: str, path_to_key_info: Dict[str, KeyInfo], 
                                              project_root: str, threshold: float) -> List[Tuple[str, str]]: # Output: List[(target_norm_path, char)]
-    config = ConfigManager()
-    embeddings_dir_rel = config.get_path("embeddings_dir", "cline_utils/dependency_system/analysis/embeddings")
-    embeddings_dir_abs = normalize_path(os.path.join(project_root, embeddings_dir_rel))
-    if not os.path.exists(embeddings_dir_abs): 
+    batch_key = _SEMANTIC_BATCH_RESULTS["key"]
+    if batch_key is not None and batch_key[0] is path_to_key_info and batch_key[1] == project_root and batch_key[2] == threshold:
+        precomputed = _SEMANTIC_BATCH_RESULTS["results"].get(file_path)
+        if precomputed is not None:
+            return precomputed # Computed for the running suggest_dependencies_batch
+
+    context = _get_suggestion_context(path_to_key_info, project_root) # Config reads are hoisted into the run context
+    embeddings_dir_abs = context.embeddings_dir_abs
+    if not _cached_isdir(embeddings_dir_abs): # Probed once per batch, not once per file
         logger.debug(f"Embeddings dir {embeddings_dir_abs} not found. No semantic suggestions for {file_path}.")
         return []
 
     source_key_info = path_to_key_info.get(file_path) 
     if not source_key_info or source_key_info.is_directory: return [] # Only for files
     
-    suggested_deps_path_based: List[Tuple[str, str]] = []
-    target_key_infos_list = [
-        info for info in path_to_key_info.values() 
-        if not info.is_directory and info.norm_path != file_path # Must be a file and not self
-    ]
-
-    if not target_key_infos_list: return [] 
-
-    # For calculate_similarity, it needs code_roots and doc_roots (relative to project_root)
-    code_roots_rel_list = config.get_code_root_directories()
-    doc_roots_rel_list = config.get_doc_directories()
-    
     try: 
-        from .embedding_manager import calculate_similarity # Local import to avoid top-level circularity
+        from .embedding_manager import calculate_similarities_batch, has_embedding # Local import to avoid top-level circularity
     except ImportError: 
-        logger.error("embedding_manager.calculate_similarity could not be imported. Semantic suggestions disabled.")
+        logger.error("embedding_manager.calculate_similarities_batch could not be imported. Semantic suggestions disabled.")
         return []
 
-    for target_ki in target_key_infos_list:
-        try:
-            # calculate_similarity expects key strings (canonical global ones)
-            confidence = calculate_similarity(
-                source_key_info.key_string, target_ki.key_string,
-                embeddings_dir_abs, path_to_key_info, project_root,
-                code_roots_rel_list, doc_roots_rel_list
-            )
-        except Exception as e_sim_calc: 
-            confidence = 0.0
-            logger.warning(f"Similarity calculation error between '{source_key_info.key_string}' and '{target_ki.key_string}': {e_sim_calc}", exc_info=False)
+    # Thresholds are invariant across targets
+    threshold_S_strong_semantic = context.semantic_strong_threshold
+    threshold_s_weak_semantic = threshold 
 
-        threshold_S_strong_semantic = config.get_threshold("code_similarity") 
-        threshold_s_weak_semantic = threshold 
+    # Without a (non-zero) source embedding every score is 0.0, which only a non-positive threshold could accept:
+    # skip building the target list and the scoring call altogether
+    if min(threshold_S_strong_semantic, threshold_s_weak_semantic) > 0 and \
+       not has_embedding(source_key_info.key_string, embeddings_dir_abs, path_to_key_info, project_root):
+        logger.debug(f"No embedding for {file_path}. No semantic suggestions.")
+        return []
 
-        assigned_char_semantic: Optional[str] = None
-        if confidence >= threshold_S_strong_semantic: assigned_char_semantic = 'S'
-        elif confidence >= threshold_s_weak_semantic: assigned_char_semantic = 's'
+    # Every file of the run is a target; the source's own position is masked out after scoring instead of
+    # filtering a fresh target list per file
+    target_key_infos_list = context.semantic_targets
+    own_position = context.semantic_target_position.get(file_path)
+    if len(target_key_infos_list) <= (own_position is not None): return [] 
 
-        if assigned_char_semantic:
-            suggested_deps_path_based.append((target_ki.norm_path, assigned_char_semantic))
-            # logger.debug(f"Semantic: {source_key_info.norm_path} -> {target_ki.norm_path} ('{assigned_char_semantic}') conf: {confidence:.3f}")
+    try:
+        # One matrix-vector product for all targets (calculate_similarities_batch expects canonical key strings)
+        confidences = calculate_similarities_batch(
+            source_key_info.key_string, context.semantic_target_keys,
+            embeddings_dir_abs, path_to_key_info, project_root,
+            list(context.code_roots_rel), list(context.doc_roots_rel)
+        )
+    except Exception as e_sim_calc: 
+        logger.warning(f"Similarity calculation error for '{source_key_info.key_string}': {e_sim_calc}", exc_info=False)
+        return []
 
-    return suggested_deps_path_based
+    # Thresholding stays vectorized; only the selected indices cross back into Python (as plain ints/bools).
+    # A target is selected if it passes either threshold; the strong mask alone then decides 'S' vs 's'.
+    strong_mask = confidences >= threshold_S_strong_semantic
+    selected_mask = strong_mask | (confidences >= threshold_s_weak_semantic)
+    if own_position is not None:
+        selected_mask[own_position] = False
+    selected_idx = np.flatnonzero(selected_mask)
+    return [(target_key_infos_list[idx].norm_path, 'S' if is_strong else 's')
+            for idx, is_strong in zip(selected_idx.tolist(), strong_mask[selected_idx].tolist())]
 
 
 # --- Helper Functions ---
+def _merge_char(current_char: Optional[str], new_char: str, get_priority: Callable[[str], int]) -> str:
+    """Returns the character to keep for a path when `new_char` is suggested on top of `current_char`."""
+    if current_char is None:
+        return new_char
+    current_priority_val = get_priority(current_char)
+    new_priority_val = get_priority(new_char)
+    if new_priority_val > current_priority_val:
+        return new_char
+    if new_priority_val == current_priority_val and new_char != current_char:
+        # Handle specific merge cases like < and > to x
+        if {new_char, current_char} == {'<', '>'}:
+            return 'x'
+    return current_char
+
 def _combine_suggestions_path_based_with_char_priority(
-    suggestions_path_based: List[Tuple[str, str]], # List[(target_norm_path, char)]
+    suggestions_path_based: Iterable[Tuple[str, str]], # (target_norm_path, char) pairs; callers chain sources instead of concatenating lists
     source_path_for_log: str 
-    ) -> List[Tuple[str, str]]: # Output: List[(target_norm_path, char)]
+    ) -> List[Tuple[str, str]]: # Output: List[(target_norm_path, char)]; kept a list since it is pickled back from batch workers
     combined_by_path: Dict[str, str] = {} # target_norm_path -> char
     config = ConfigManager()
     get_priority = config.get_char_priority
+    get_current = combined_by_path.get
 
     for target_path, char_val in suggestions_path_based:
         if not target_path or target_path == source_path_for_log: continue 
-
-        current_char_for_path = combined_by_path.get(target_path)
-        current_priority_val = get_priority(current_char_for_path) if current_char_for_path else -1
-        new_priority_val = get_priority(char_val)
-
-        if new_priority_val > current_priority_val:
+        current_char = get_current(target_path)
+        # Only a different char on an already-suggested path needs the priority tables; a repeat of the same char never changes it
+        if current_char is None:
             combined_by_path[target_path] = char_val
-        elif new_priority_val == current_priority_val and char_val != current_char_for_path and current_char_for_path is not None:
-            # Handle specific merge cases like < and > to x
-            if {char_val, current_char_for_path} == {'<', '>'}: 
-                if combined_by_path.get(target_path) != 'x': 
-                    combined_by_path[target_path] = 'x'
+        elif current_char != char_val:
+            combined_by_path[target_path] = _merge_char(current_char, char_val, get_priority)
     return list(combined_by_path.items())
 
 # --- Dependency Identification Helpers ---
@@ -842,13 +1361,33 @@ def _convert_python_import_to_paths(
     project_symbol_map: Dict[str, Dict[str, Any]], # For verifying specific_item_name
     specific_item_name: Optional[str] = None,    # e.g., "X" in "from .foo import X"
     _is_from_import: bool = False, # Kept for signature, could be used for nuanced logic
-    relative_level: int = 0       # 0 for absolute, 1 for '.', 2 for '..'
+    relative_level: int = 0,      # 0 for absolute, 1 for '.', 2 for '..'
+    context: Optional[SuggestionContext] = None # Run-wide invariants (code roots); built if omitted
 ) -> List[Tuple[str, bool]]: # Returns List[(resolved_module_path, item_verified_in_module_symbols)]
-    
-    potential_paths_abs_info: List[Tuple[str, bool]] = [] # (path, item_verified_flag)
-    normalized_project_root = normalize_path(project_root)
-    
-    candidate_module_file_paths_to_check_in_map: List[str] = []
+    # Contract: every returned resolved_module_path is a key of path_to_key_info (normalized), so callers need not re-normalize.
+    # Results are memoized in the run's SuggestionContext; callers must not mutate the returned list.
+    if context is None:
+        context = _get_suggestion_context(path_to_key_info, project_root)
+    # Absolute imports resolve the same way from every file, so the source dir only matters for relative ones
+    cache_key = (import_name, source_file_dir if relative_level else '', relative_level, specific_item_name)
+    resolved = context.import_resolution_cache.get(cache_key)
+    if resolved is None:
+        resolved = _resolve_python_import_to_paths(import_name, source_file_dir, path_to_key_info, project_symbol_map,
+                                                   specific_item_name, relative_level, context)
+        context.import_resolution_cache[cache_key] = resolved
+    return resolved
+
+def _iter_python_import_candidates(
+    import_name: str,
+    source_file_dir: str,
+    relative_level: int,
+    context: SuggestionContext
+):
+    """
+    Lazily yields the normalized candidate module files for an import, in resolution priority order.
+    Bases are already normalized absolute paths, so candidates are built with '/' directly.
+    """
+    normalized_project_root = context.project_root_norm
 
     if relative_level > 0: 
         current_search_base = normalize_path(source_file_dir)
@@ -856,60 +1395,58 @@ def _convert_python_import_to_paths(
             parent_dir = os.path.dirname(current_search_base)
             if not parent_dir or parent_dir == current_search_base or \
                (not parent_dir.startswith(normalized_project_root) and parent_dir != normalized_project_root):
-                current_search_base = None; break
+                return
             current_search_base = parent_dir
         
-        if current_search_base:
-            module_path_part_rel = import_name.replace('.', os.sep) if import_name else ""
-            base_path_for_relative_import = normalize_path(os.path.join(current_search_base, module_path_part_rel))
-            candidate_module_file_paths_to_check_in_map.append(f"{base_path_for_relative_import}.py")
-            candidate_module_file_paths_to_check_in_map.append(normalize_path(os.path.join(base_path_for_relative_import, "__init__.py")))
+        base_path_for_relative_import = f"{current_search_base}/{import_name.replace('.', '/')}" if import_name else current_search_base
+        yield f"{base_path_for_relative_import}.py"
+        yield f"{base_path_for_relative_import}/__init__.py"
 
     elif import_name: # Absolute import (relative_level == 0)
-        fs_like_import_path = import_name.replace('.', os.sep)
+        fs_like_import_path = import_name.replace('.', '/')
         
         # 1. Try relative to project_root
-        base_abs_from_proj_root = normalize_path(os.path.join(normalized_project_root, fs_like_import_path))
-        candidate_module_file_paths_to_check_in_map.append(f"{base_abs_from_proj_root}.py")
-        candidate_module_file_paths_to_check_in_map.append(normalize_path(os.path.join(base_abs_from_proj_root, "__init__.py")))
+        base_abs_from_proj_root = f"{normalized_project_root}/{fs_like_import_path}"
+        yielded = {f"{base_abs_from_proj_root}.py", f"{base_abs_from_proj_root}/__init__.py"}
+        yield f"{base_abs_from_proj_root}.py"
+        yield f"{base_abs_from_proj_root}/__init__.py"
 
         # 2. Try relative to each configured code_root
-        try:
-            configured_code_roots_rel = ConfigManager().get_code_root_directories()
-            for cr_rel in configured_code_roots_rel:
-                abs_code_root = normalize_path(os.path.join(normalized_project_root, cr_rel))
-                # Check if import_name starts with the code_root's relative name (e.g., "src.")
-                # If import_name = "src.module.foo" and cr_rel = "src"
-                if import_name.startswith(cr_rel + '.'):
-                    # The "project_root" case above already handles this correctly because
-                    # fs_like_import_path would be "src/module/foo".
-                    # os.path.join(project_root, "src/module/foo") is the correct base.
-                    # No special action needed here to avoid double prefixing "src/src/...".
-                    pass
-                else:
-                    # Handles imports like "my_module" when "src" is a code root,
-                    # looking for "project_root/src/my_module.py"
-                    base_abs_from_code_root = normalize_path(os.path.join(abs_code_root, fs_like_import_path))
-                    candidate_module_file_paths_to_check_in_map.append(f"{base_abs_from_code_root}.py")
-                    candidate_module_file_paths_to_check_in_map.append(normalize_path(os.path.join(base_abs_from_code_root, "__init__.py")))
-        except Exception as e_cfg:
-             logger.warning(f"Error getting code_root_directories for absolute import fallback: {e_cfg}")
-        
-        candidate_module_file_paths_to_check_in_map = list(set(candidate_module_file_paths_to_check_in_map)) # Deduplicate
-        logger.debug(f"Absolute import '{import_name}': Candidate file paths to check: {candidate_module_file_paths_to_check_in_map}")
+        for cr_rel, abs_code_root in zip(context.code_roots_rel, context.abs_code_roots):
+            # Imports like "src.module.foo" with code root "src" are already covered by the
+            # project_root candidates above ("src/module/foo"); don't double prefix "src/src/...".
+            if import_name.startswith(cr_rel + '.'):
+                continue
+            # Handles imports like "my_module" when "src" is a code root,
+            # looking for "project_root/src/my_module.py"
+            base_abs_from_code_root = f"{abs_code_root}/{fs_like_import_path}"
+            for candidate in (f"{base_abs_from_code_root}.py", f"{base_abs_from_code_root}/__init__.py"):
+                if candidate not in yielded:
+                    yielded.add(candidate)
+                    yield candidate
+
+def _resolve_python_import_to_paths(
+    import_name: str,
+    source_file_dir: str,
+    path_to_key_info: Dict[str, KeyInfo],
+    project_symbol_map: Dict[str, Dict[str, Any]],
+    specific_item_name: Optional[str],
+    relative_level: int,
+    context: SuggestionContext
+) -> List[Tuple[str, bool]]: # Uncached worker for _convert_python_import_to_paths
+    potential_paths_abs_info: List[Tuple[str, bool]] = [] # (path, item_verified_flag)
+    debug_enabled = logger.isEnabledFor(logging.DEBUG) # Runs once per distinct import; keep the f-strings off that path
 
     # --- Check generated candidates against path_to_key_info and verify specific_item_name ---
+    # Candidates are generated lazily, so an absolute import stops generating at its first tracked match.
     seen_paths = set()
-    for p_candidate_str in candidate_module_file_paths_to_check_in_map:
+    for p_candidate_str in _iter_python_import_candidates(import_name, source_file_dir, relative_level, context):
         # p_candidate_str is already a normalized absolute path from the generation logic
         if p_candidate_str in path_to_key_info: # Direct check against tracked files
             if p_candidate_str not in seen_paths:
                 item_verified_in_symbols = True # Default to true if no specific item to check
                 if specific_item_name:
-                    module_symbols = project_symbol_map.get(p_candidate_str, {})
-                    is_defined = any(f.get('name') == specific_item_name for f in module_symbols.get("functions", [])) or \
-                                 any(c.get('name') == specific_item_name for c in module_symbols.get("classes", [])) or \
-                                 any(g.get('name') == specific_item_name for g in module_symbols.get("globals_defined", []))
+                    is_defined = specific_item_name in _module_symbol_index(project_symbol_map, p_candidate_str).all_names
                     
                     if not is_defined and os.path.basename(p_candidate_str) == "__init__.py":
                         # Check for re-exported submodule/subpackage if the resolved module is an __init__.py
@@ -921,11 +1458,13 @@ def _convert_python_import_to_paths(
                         if potential_submodule_file in path_to_key_info or \
                            potential_subpackage_init in path_to_key_info:
                             is_defined = True 
-                            logger.debug(f"Import Check: Item '{specific_item_name}' imported from '{import_name}' (via package '{p_candidate_str}') appears to be a tracked re-exported submodule/package.")
+                            if debug_enabled:
+                                logger.debug(f"Import Check: Item '{specific_item_name}' imported from '{import_name}' (via package '{p_candidate_str}') appears to be a tracked re-exported submodule/package.")
                             
                     if not is_defined:
                         item_verified_in_symbols = False
-                        logger.debug(f"Import Check: Item '{specific_item_name}' imported from '{import_name}' (resolved to module '{p_candidate_str}') not found in its defined symbols or as a tracked submodule/package.")
+                        if debug_enabled:
+                            logger.debug(f"Import Check: Item '{specific_item_name}' imported from '{import_name}' (resolved to module '{p_candidate_str}') not found in its defined symbols or as a tracked submodule/package.")
                 
                 potential_paths_abs_info.append((p_candidate_str, item_verified_in_symbols))
                 seen_paths.add(p_candidate_str)
@@ -933,11 +1472,12 @@ def _convert_python_import_to_paths(
                 # For absolute imports, Python's import machinery typically stops at the first match.
                 # We replicate this behavior by returning after the first successful resolution.
                 if relative_level == 0 and potential_paths_abs_info: 
-                    logger.debug(f"Absolute import '{import_name}' resolved to '{p_candidate_str}'. Taking first match.")
+                    if debug_enabled:
+                        logger.debug(f"Absolute import '{import_name}' resolved to '{p_candidate_str}'. Taking first match.")
                     return potential_paths_abs_info # Return immediately
                 
-    if not potential_paths_abs_info and import_name: 
-        logger.debug(f"Could not resolve import '{import_name}' (item: {specific_item_name}, level:{relative_level}) from source '{source_file_dir}' to any *tracked* project files. Candidates checked (sample): {candidate_module_file_paths_to_check_in_map[:3]}")
+    if not potential_paths_abs_info and import_name and debug_enabled: 
+        logger.debug(f"Could not resolve import '{import_name}' (item: {specific_item_name}, level:{relative_level}) from source '{source_file_dir}' to any *tracked* project files.")
     return potential_paths_abs_info
 # ---
 
@@ -945,14 +1485,17 @@ def _identify_python_dependencies(source_path: str, source_analysis: Dict[str, A
                                  _file_analysis_results: Dict[str, Dict[str, Any]], 
                                  project_root: str,
                                  path_to_key_info: Dict[str, KeyInfo],
-                                 project_symbol_map: Dict[str, Dict[str, Any]] 
-                                 ) -> Tuple[List[Tuple[str, str]], List[Dict[str, str]]]: # MODIFIED return type
-    dependencies_paths: List[Tuple[str, str]] = []
-    raw_ast_links: List[Dict[str, str]] = [] # NEW: For collecting AST-derived links
+                                 project_symbol_map: Dict[str, Dict[str, Any]],
+                                 context: Optional[SuggestionContext] = None
+                                 ) -> Tuple[List[Tuple[str, str]], List[ASTLink]]: # MODIFIED return type
+    dependencies_paths: Dict[Tuple[str, str], None] = {} # Insertion-ordered set: dedupes as it collects
+    raw_ast_links: List[ASTLink] = [] # NEW: For collecting AST-derived links
 
     imports_in_source = source_analysis.get("imports", []) 
     source_dir_norm = os.path.dirname(source_path)
-    tracked_paths_globally = set(path_to_key_info.keys())
+    if context is None:
+        context = _get_suggestion_context(path_to_key_info, project_root)
+    tracked_paths_globally = context.tracked_paths
 
     for import_name_str_from_ast in imports_in_source: # This is like "module" or ".module" or "..module.sub"
          temp_import_name = import_name_str_from_ast
@@ -970,26 +1513,102 @@ def _identify_python_dependencies(source_path: str, source_analysis: Dict[str, A
              project_symbol_map=project_symbol_map, 
              specific_item_name=None, 
              _is_from_import=True, 
-             relative_level=level_for_convert
+             relative_level=level_for_convert,
+             context=context
          )
          for path_abs_val, item_verified_flag in resolved_path_infos:
              if path_abs_val in tracked_paths_globally and path_abs_val != source_path: 
                  dep_char = "<" # Explicit imports are a direct dependency
-                 dependencies_paths.append((path_abs_val, dep_char))
+                 dependencies_paths[(path_abs_val, dep_char)] = None
                  
                  # NEW: Collect this resolved import as an AST-verified link
-                 raw_ast_links.append({
-                     "source_path": source_path,
-                     "target_path": path_abs_val,
-                     "char": dep_char,
-                     "reason": f"ExplicitImport/{import_name_str_from_ast}"
-                 })
+                 raw_ast_links.append(ASTLink(source_path, path_abs_val, dep_char, f"ExplicitImport/{import_name_str_from_ast}"))
                  # ---
                  
                  if not item_verified_flag and module_to_resolve_for_convert: 
                      logger.debug(f"PythonDep: Import of '{module_to_resolve_for_convert}' from '{source_path}' resolved to module '{path_abs_val}', but specific item verification status: {item_verified_flag}.")
                  break 
-    return list(set(dependencies_paths)), list(raw_ast_links)
+    return list(dependencies_paths), raw_ast_links
+
+def _js_stem_index(directory: str, file_names: frozenset) -> Dict[str, str]:
+    """
+    Maps each extensionless module name in `directory` to its file, keeping the first extension in
+    _JS_EXTENSIONS order, so an extensionless import probes one dict entry instead of one name per extension.
+    """
+    index = _JS_STEM_INDEX_CACHE.get(directory)
+    if index is None:
+        index, ranks = {}, {}
+        for name in file_names:
+            dot = name.rfind('.')
+            rank = _JS_EXTENSION_RANK.get(name[dot:]) if dot >= 0 else None
+            if rank is not None and rank < ranks.get(name[:dot], len(_JS_EXTENSIONS)):
+                index[name[:dot]] = name
+                ranks[name[:dot]] = rank
+        _JS_STEM_INDEX_CACHE[directory] = index
+    return index
+
+def _resolve_js_module_file(base_path: str, norm_project_root: str) -> Optional[str]:
+    """
+    Resolves a normalized import base path to a file inside the project: the path itself if it has a
+    JS/TS extension, else base + extension, else base/index + extension (in _JS_EXTENSIONS order).
+    Probes are gated on directory existence (Metro-style) and answered from one listing of the parent
+    directory (and of base_path for index files) instead of a stat per candidate.
+    """
+    parent_dir, base_name = os.path.split(base_path)
+    parent_entries = _dir_entries(parent_dir)
+    if parent_entries is None:
+        return None # Missing parent: neither base_path, base + ext, nor base/index can exist
+    parent_files, parent_subdirs = parent_entries
+    if base_path.lower().endswith(_JS_EXTENSIONS) and base_name in parent_files:
+        return base_path if base_path.startswith(norm_project_root) else None
+    if not base_path.startswith(norm_project_root):
+        return None # Every candidate below extends base_path
+    module_file = _js_stem_index(parent_dir, parent_files).get(base_name)
+    if module_file is not None:
+        return f"{base_path}{module_file[len(base_name):]}"
+    if base_name in parent_subdirs:
+        base_entries = _dir_entries(base_path)
+        if base_entries is not None:
+            index_file = _js_stem_index(base_path, base_entries[0]).get("index")
+            if index_file is not None:
+                return f"{base_path}/{index_file}"
+    return None
+
+def _resolve_relative_js_import(import_path: str, source_dir_norm: str, norm_project_root: str) -> Optional[str]:
+    """Resolves a './' or '../' import against the importing file's directory; None if outside the project or missing."""
+    base_resolved_path = _join_normalized(source_dir_norm, import_path)
+    if not base_resolved_path.startswith(norm_project_root):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"JS relative import '{import_path}' resolved to '{base_resolved_path}' outside project. Skipping.")
+        return None
+    resolved_path = _resolve_js_module_file(base_resolved_path, norm_project_root)
+    if resolved_path and logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"JS Resolve: Relative import '{import_path}' resolved to '{resolved_path}'.")
+    return resolved_path
+
+def _resolve_bare_js_import(import_path: str, norm_project_root: str, tsconfig_dir_path: Optional[str],
+                            base_url: Optional[str], paths: Optional[Dict[str, List[str]]]) -> Optional[str]:
+    """Resolves a non-relative import via the tsconfig paths aliases, then via baseUrl; None if neither applies."""
+    if paths and tsconfig_dir_path:
+        # Match against the tsconfig paths (e.g., "@components/*": ["src/components/*"]); first alias in config order wins
+        alias_match = _match_tsconfig_alias(import_path, paths)
+        if alias_match:
+            target_path_patterns, wildcard_part = alias_match # wildcard_part e.g. "/Button" or "/ui/Card"
+            # Targets are relative to baseUrl if set, else to the tsconfig's directory
+            resolution_base_dir = base_url if base_url else tsconfig_dir_path
+            for pattern in target_path_patterns:
+                resolved_path = _resolve_js_module_file(_join_normalized(resolution_base_dir, pattern + wildcard_part), norm_project_root)
+                if resolved_path:
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(f"JS Resolve: Alias '{import_path}' resolved to '{resolved_path}' via tsconfig.")
+                    return resolved_path
+    if base_url:
+        # This path is not an alias, and not relative. Try resolving from baseUrl.
+        resolved_path = _resolve_js_module_file(_join_normalized(base_url, import_path), norm_project_root)
+        if resolved_path and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"JS Resolve: Non-relative import '{import_path}' resolved to '{resolved_path}' via baseUrl.")
+        return resolved_path
+    return None
 
 def _identify_javascript_dependencies(source_path: str, source_analysis: Dict[str, Any],
                                     _file_analyses: Dict[str, Dict[str, Any]], 
@@ -999,12 +1618,12 @@ def _identify_javascript_dependencies(source_path: str, source_analysis: Dict[st
                                     tsconfig_info: Optional[Tuple[str, Dict[str, Any]]] = None 
                                     ) -> List[Tuple[str, str]]:
     logger.debug(f"JS Deps: project_symbol_map received but specific item verification from JS imports is currently limited by analyzer's output for JS.")
-    dependencies_paths: List[Tuple[str, str]] = []
+    dependencies_paths: Set[Tuple[str, str]] = set() # Deduplicated as collected
     # raw_imports_in_source is List[str] like "./utils" or "@alias/component"
     raw_imports_in_source = source_analysis.get("imports", []) 
     source_dir_norm = os.path.dirname(source_path)
-    tracked_paths_globally = set(path_to_key_info.keys())
-    js_extensions_check = ['.js', '.jsx', '.ts', '.tsx', '.mjs', '.cjs'] 
+    norm_project_root = normalize_path(project_root) # Hoisted: used for every containment check below
+    debug_enabled = logger.isEnabledFor(logging.DEBUG) # Per-import messages are only formatted when DEBUG is on
 
     # Extract baseUrl and paths from tsconfig_info if available
     base_url_from_config: Optional[str] = None
@@ -1023,105 +1642,42 @@ def _identify_javascript_dependencies(source_path: str, source_analysis: Dict[st
         if isinstance(raw_paths, dict):
             paths_from_config = raw_paths
             logger.debug(f"JS Resolve: Using paths configuration: {paths_from_config} (from {tsconfig_info[0]})")
+    # Bare specifiers (e.g. "react") resolve the same way for every file sharing a tsconfig
+    unresolved_key_prefix = tsconfig_info[0] if tsconfig_info else None
+    seen_imports: Set[str] = set()
     for import_path_str_val in raw_imports_in_source:
         if not import_path_str_val or \
-           import_path_str_val.startswith(('http:', 'https:', '//', 'data:')): 
+           import_path_str_val.startswith(_SKIP_JS_PREFIXES): 
             continue
-        resolved_target_path_abs: Optional[str] = None
-        potential_alias_resolved_paths: List[str] = []
-        if not import_path_str_val.startswith('.') and paths_from_config and tsconfig_dir_path:
-            # Try to match import_path_str_val against keys in paths_from_config
-            for alias, target_path_patterns in paths_from_config.items():
-                # Handle wildcard matching (e.g., "@components/*": ["src/components/*"])
-                if alias.endswith('/*'):
-                    alias_prefix = alias[:-2] # e.g., "@components"
-                    if import_path_str_val.startswith(alias_prefix):
-                        wildcard_part = import_path_str_val[len(alias_prefix):] # e.g., "/Button" or "/ui/Card"
-                        for pattern in target_path_patterns:
-                            if pattern.endswith('/*'):
-                                resolved_alias_base = pattern[:-2] + wildcard_part
-                                # This resolved_alias_base is relative to tsconfig_dir_path or baseUrl
-                                resolution_base_dir = base_url_from_config if base_url_from_config else tsconfig_dir_path
-                                potential_alias_resolved_paths.append(normalize_path(os.path.join(resolution_base_dir, resolved_alias_base)))
-                        if potential_alias_resolved_paths: break # Found a matching alias pattern
-                elif import_path_str_val == alias: # Exact match
-                    for pattern in target_path_patterns:
-                        resolution_base_dir = base_url_from_config if base_url_from_config else tsconfig_dir_path
-                        potential_alias_resolved_paths.append(normalize_path(os.path.join(resolution_base_dir, pattern)))
-                    if potential_alias_resolved_paths: break # Found an exact alias match
-            
-            for alias_res_path_attempt in potential_alias_resolved_paths:
-                has_known_ext_alias = any(alias_res_path_attempt.lower().endswith(ext) for ext in js_extensions_check)
-                if has_known_ext_alias and os.path.isfile(alias_res_path_attempt):
-                    if alias_res_path_attempt.startswith(normalize_path(project_root)): 
-                        resolved_target_path_abs = alias_res_path_attempt; break
-                else:
-                    for ext_try in js_extensions_check:
-                        if os.path.isfile(f"{alias_res_path_attempt}{ext_try}") and \
-                           (f"{alias_res_path_attempt}{ext_try}").startswith(normalize_path(project_root)):
-                            resolved_target_path_abs = f"{alias_res_path_attempt}{ext_try}"; break
-                    if resolved_target_path_abs: break
-                    for ext_try in js_extensions_check: 
-                        idx_path = normalize_path(os.path.join(alias_res_path_attempt, f"index{ext_try}"))
-                        if os.path.isfile(idx_path) and idx_path.startswith(normalize_path(project_root)):
-                            resolved_target_path_abs = idx_path; break
-                    if resolved_target_path_abs: break
-            if resolved_target_path_abs:
-                 logger.debug(f"JS Resolve: Alias '{import_path_str_val}' resolved to '{resolved_target_path_abs}' via tsconfig.")
-        if not resolved_target_path_abs and import_path_str_val.startswith('.'): 
-            base_resolved_path = normalize_path(os.path.abspath(os.path.join(source_dir_norm, import_path_str_val))) 
-            if not base_resolved_path.startswith(normalize_path(project_root)):
-                logger.debug(f"JS relative import '{import_path_str_val}' in '{source_path}' resolved to '{base_resolved_path}' outside project. Skipping.")
-                continue
-            has_known_ext = any(base_resolved_path.lower().endswith(ext) for ext in js_extensions_check)
-            if has_known_ext and os.path.isfile(base_resolved_path):
-                resolved_target_path_abs = base_resolved_path
-            else: 
-                for ext_try in js_extensions_check:
-                    if os.path.isfile(f"{base_resolved_path}{ext_try}"):
-                        resolved_target_path_abs = f"{base_resolved_path}{ext_try}"; break
-                if not resolved_target_path_abs: 
-                    for ext_try in js_extensions_check:
-                        idx_path = normalize_path(os.path.join(base_resolved_path, f"index{ext_try}"))
-                        if os.path.isfile(idx_path):
-                            resolved_target_path_abs = idx_path; break
-            if resolved_target_path_abs:
-                 logger.debug(f"JS Resolve: Relative import '{import_path_str_val}' resolved to '{resolved_target_path_abs}'.")
-        if not resolved_target_path_abs and not import_path_str_val.startswith('.') and base_url_from_config:
-            # This path is not an alias, and not relative. Try resolving from baseUrl.
-            path_from_base_url = normalize_path(os.path.join(base_url_from_config, import_path_str_val))
-            # Apply extension/index checks again for this path_from_base_url
-            has_known_ext_base = any(path_from_base_url.lower().endswith(ext) for ext in js_extensions_check)
-            if has_known_ext_base and os.path.isfile(path_from_base_url):
-                if path_from_base_url.startswith(normalize_path(project_root)):
-                    resolved_target_path_abs = path_from_base_url
-            else:
-                for ext_try in js_extensions_check:
-                    if os.path.isfile(f"{path_from_base_url}{ext_try}") and \
-                       (f"{path_from_base_url}{ext_try}").startswith(normalize_path(project_root)):
-                        resolved_target_path_abs = f"{path_from_base_url}{ext_try}"; break
-                if not resolved_target_path_abs:
-                    for ext_try in js_extensions_check:
-                        idx_path = normalize_path(os.path.join(path_from_base_url, f"index{ext_try}"))
-                        if os.path.isfile(idx_path) and idx_path.startswith(normalize_path(project_root)):
-                            resolved_target_path_abs = idx_path; break
-            if resolved_target_path_abs:
-                 logger.debug(f"JS Resolve: Non-relative import '{import_path_str_val}' resolved to '{resolved_target_path_abs}' via baseUrl.")
-        if resolved_target_path_abs and resolved_target_path_abs in tracked_paths_globally and resolved_target_path_abs != source_path:
+        if import_path_str_val in seen_imports: continue # Same specifier resolves the same way within a file
+        seen_imports.add(import_path_str_val)
+        if (unresolved_key_prefix, import_path_str_val) in _UNRESOLVED_JS_IMPORTS:
+            continue # Known not to resolve within the project (external package or missing)
+        # Classified once: relative specifiers never go through aliases/baseUrl, bare ones never through the source dir
+        is_relative_import = import_path_str_val.startswith('.')
+        if is_relative_import:
+            resolved_target_path_abs = _resolve_relative_js_import(import_path_str_val, source_dir_norm, norm_project_root)
+        else:
+            resolved_target_path_abs = _resolve_bare_js_import(import_path_str_val, norm_project_root, tsconfig_dir_path,
+                                                               base_url_from_config, paths_from_config)
+        if resolved_target_path_abs and resolved_target_path_abs in path_to_key_info and resolved_target_path_abs != source_path:
             # At this point, resolved_target_path_abs is the path to the imported module file.
             # We don't have the specific named imports from the simple regex in dependency_analyzer.
             # So, we assume a dependency on the module file itself.
             # If we had specific named imports, e.g., `imported_item_name`, we could check:
             #   module_symbols = project_symbol_map.get(resolved_target_path_abs, {})
             #   if any(exp['name'] == imported_item_name for exp in module_symbols.get("exports", [])):
-            #       dependencies_paths.append((resolved_target_path_abs, "<"))
+            #       dependencies_paths.add((resolved_target_path_abs, "<"))
             #   else:
             #       logger.debug(f"JS Import Check: Item '{imported_item_name}' from '{import_path_str_val}' (resolved to '{resolved_target_path_abs}') not found in its exports.")
             # For now, a simpler approach:
-            dependencies_paths.append((resolved_target_path_abs, "<")) 
-        elif not resolved_target_path_abs and not import_path_str_val.startswith('.'):
-             logger.debug(f"JS non-relative import '{import_path_str_val}' in '{source_path}' could not be resolved within the project (checked tsconfig aliases/baseUrl). Might be an external package or unresolved.")
-    return list(set(dependencies_paths))
+            # Interned: the same target strings recur across files and end up as keys downstream
+            dependencies_paths.add((sys.intern(resolved_target_path_abs), "<")) 
+        elif not resolved_target_path_abs and not is_relative_import:
+             _UNRESOLVED_JS_IMPORTS.add((unresolved_key_prefix, import_path_str_val))
+             if debug_enabled:
+                 logger.debug(f"JS non-relative import '{import_path_str_val}' in '{source_path}' could not be resolved within the project (checked tsconfig aliases/baseUrl). Might be an external package or unresolved.")
+    return list(dependencies_paths)
 
 
 def _identify_markdown_dependencies(source_path: str, source_analysis: Dict[str, Any],
@@ -1129,125 +1685,138 @@ def _identify_markdown_dependencies(source_path: str, source_analysis: Dict[str,
                                   project_root: str, 
                                   path_to_key_info: Dict[str, KeyInfo]
                                   ) -> List[Tuple[str, str]]:
-    dependencies_paths: List[Tuple[str, str]] = []
+    dependencies_paths: Set[Tuple[str, str]] = set() # Deduplicated as collected
     links_in_source = source_analysis.get("links", []) 
     source_dir_norm = os.path.dirname(source_path)
-    tracked_paths_globally = set(path_to_key_info.keys())
     norm_project_root = normalize_path(project_root)
+    debug_enabled = logger.isEnabledFor(logging.DEBUG) # Per-link messages are only formatted when DEBUG is on
+    seen_urls: Set[str] = set()
     for link_item in links_in_source:
         url_val = link_item.get("url", "")
-        if not url_val or url_val.startswith(('#', 'mailto:', 'tel:', 'http:', 'https:', '//', 'data:')): continue
-        url_cleaned_val = url_val.split('#')[0].split('?')[0] 
+        if not url_val or url_val.startswith(_SKIP_URL_PREFIXES): continue
+        if url_val in seen_urls: continue # Repeated links resolve the same way
+        seen_urls.add(url_val)
+        url_cleaned_val = _strip_query_fragment(url_val) 
         if not url_cleaned_val: continue
         if os.path.isabs(url_cleaned_val): 
-            logger.debug(f"MD Link: Skipping absolute-looking URL '{url_cleaned_val}' in '{source_path}'.")
+            if debug_enabled:
+                logger.debug(f"MD Link: Skipping absolute-looking URL '{url_cleaned_val}' in '{source_path}'.")
             continue
-        resolved_base_path_abs = normalize_path(os.path.abspath(os.path.join(source_dir_norm, url_cleaned_val)))
+        resolved_base_path_abs = _join_normalized(source_dir_norm, url_cleaned_val)
         
         # Ensure resolved path is within the project
         if not resolved_base_path_abs.startswith(norm_project_root):
-            logger.debug(f"MD Link: Resolved path '{resolved_base_path_abs}' for link '{url_cleaned_val}' in '{source_path}' is outside project. Skipping.")
+            if debug_enabled:
+                logger.debug(f"MD Link: Resolved path '{resolved_base_path_abs}' for link '{url_cleaned_val}' in '{source_path}' is outside project. Skipping.")
+            continue
+        # Every candidate lives in or under the link's parent directory; one listing answers the probes
+        parent_dir_md, link_name_md = os.path.split(resolved_base_path_abs)
+        parent_entries_md = _dir_entries(parent_dir_md)
+        if parent_entries_md is None:
             continue
-        possible_target_paths_check = [resolved_base_path_abs]
+        parent_files_md, parent_subdirs_md = parent_entries_md
+        # Existing files only, in lookup order: the path itself, .md/.rst siblings, then index.md/README.md inside it
+        possible_target_paths_check = [resolved_base_path_abs] if link_name_md in parent_files_md else []
         _base_name_md, base_ext_md = os.path.splitext(resolved_base_path_abs)
-        if not base_ext_md or os.path.isdir(resolved_base_path_abs): 
-            possible_target_paths_check.extend([
-                f"{resolved_base_path_abs}.md", f"{resolved_base_path_abs}.rst",
-                normalize_path(os.path.join(resolved_base_path_abs, "index.md")),
-                normalize_path(os.path.join(resolved_base_path_abs, "README.md"))
-            ])
+        is_dir_md = link_name_md in parent_subdirs_md
+        if not base_ext_md or is_dir_md: 
+            possible_target_paths_check.extend(f"{resolved_base_path_abs}{ext}" for ext in (".md", ".rst")
+                                               if f"{link_name_md}{ext}" in parent_files_md)
+            if is_dir_md:
+                link_dir_entries_md = _dir_entries(resolved_base_path_abs)
+                if link_dir_entries_md is not None:
+                    possible_target_paths_check.extend(f"{resolved_base_path_abs}/{index_name}" for index_name in ("index.md", "README.md")
+                                                       if index_name in link_dir_entries_md[0])
         found_target_path_md: Optional[str] = None
         for target_path_try in possible_target_paths_check:
-            if os.path.isfile(target_path_try) and target_path_try in tracked_paths_globally:
+            if target_path_try in path_to_key_info:
                 found_target_path_md = target_path_try; break
         if found_target_path_md and found_target_path_md != source_path:
-            dependencies_paths.append((found_target_path_md, "d")) 
-    return list(set(dependencies_paths))
+            dependencies_paths.add((sys.intern(found_target_path_md), "d")) 
+    return list(dependencies_paths)
 
 def _identify_html_dependencies(source_path: str, source_analysis: Dict[str, Any],
                               _file_analyses: Dict[str, Dict[str, Any]], 
                               project_root: str, 
-                              path_to_key_info: Dict[str, KeyInfo]
+                              path_to_key_info: Dict[str, KeyInfo],
+                              context: Optional[SuggestionContext] = None
                               ) -> List[Tuple[str, str]]:
-    dependencies_paths: List[Tuple[str, str]] = []
+    dependencies_paths: Set[Tuple[str, str]] = set() # Deduplicated as collected
     source_dir_norm = os.path.dirname(source_path)
-    tracked_paths_globally = set(path_to_key_info.keys())
     norm_project_root = normalize_path(project_root)
 
-    # --- ADDED: Get doc_roots from ConfigManager ---
-    config = ConfigManager()
-    # get_doc_directories returns relative paths, convert them to absolute
-    abs_doc_roots = [normalize_path(os.path.join(norm_project_root, dr)) for dr in config.get_doc_directories()]
-    if not abs_doc_roots: # Fallback to project_root if no doc_roots are configured
-        abs_doc_roots = [norm_project_root]
-    urls_to_check_html: List[Tuple[Optional[str], str]] = [] 
-    for link_item in source_analysis.get("links", []): urls_to_check_html.append((link_item.get("url"), "link")) 
-    for script_item in source_analysis.get("scripts", []): urls_to_check_html.append((script_item.get("url"), "script")) 
-    for style_item in source_analysis.get("stylesheets", []): urls_to_check_html.append((style_item.get("url"), "style")) 
-    for img_item in source_analysis.get("images", []): urls_to_check_html.append((img_item.get("url"), "image")) 
+    # Doc roots (absolute, project root fallback) are resolved once per run in the SuggestionContext
+    if context is None:
+        context = _get_suggestion_context(path_to_key_info, project_root)
+    abs_doc_roots = context.abs_doc_roots
+    debug_enabled = logger.isEnabledFor(logging.DEBUG) # Per-link messages are only formatted when DEBUG is on
+    urls_to_check_html: Iterable[Tuple[Optional[str], str]] = chain( # Consumed lazily, no intermediate list
+        ((link_item.get("url"), "link") for link_item in source_analysis.get("links", ())),
+        ((script_item.get("url"), "script") for script_item in source_analysis.get("scripts", ())),
+        ((style_item.get("url"), "style") for style_item in source_analysis.get("stylesheets", ())),
+        ((img_item.get("url"), "image") for img_item in source_analysis.get("images", ())),
+    )
     for url_val_html, resource_type_hint_html in urls_to_check_html:
-        if not url_val_html or url_val_html.startswith(('#', 'mailto:', 'tel:', 'http:', 'https:', '//', 'data:')): continue
-        url_cleaned_html = url_val_html.split('#')[0].split('?')[0]
+        if not url_val_html or url_val_html.startswith(_SKIP_URL_PREFIXES): continue
+        url_cleaned_html = _strip_query_fragment(url_val_html)
         if not url_cleaned_html: continue
         resolved_path_abs_html: Optional[str] = None
         if url_cleaned_html.startswith('/'):
             # --- MODIFIED: Try resolving against each doc_root ---
             path_relative_to_root = url_cleaned_html.lstrip('/')
             for doc_root_abs in abs_doc_roots:
-                potential_path = normalize_path(os.path.abspath(os.path.join(doc_root_abs, path_relative_to_root)))
-                if potential_path.startswith(norm_project_root) and os.path.isfile(potential_path): 
+                potential_path = _join_normalized(doc_root_abs, path_relative_to_root)
+                if potential_path.startswith(norm_project_root) and _is_listed_file(potential_path): 
                     resolved_path_abs_html = potential_path
-                    logger.debug(f"HTML Link: Root-relative '{url_cleaned_html}' resolved to '{resolved_path_abs_html}' via doc_root '{doc_root_abs}'.")
+                    if debug_enabled:
+                        logger.debug(f"HTML Link: Root-relative '{url_cleaned_html}' resolved to '{resolved_path_abs_html}' via doc_root '{doc_root_abs}'.")
                     break 
-            if not resolved_path_abs_html:
+            if not resolved_path_abs_html and debug_enabled:
                  logger.debug(f"HTML Link: Root-relative '{url_cleaned_html}' in '{source_path}' could not be resolved against configured doc_roots: {abs_doc_roots}.")
         else: 
             # Relative to the current HTML file's directory
-            potential_path_rel = normalize_path(os.path.abspath(os.path.join(source_dir_norm, url_cleaned_html)))
-            if potential_path_rel.startswith(norm_project_root) and os.path.isfile(potential_path_rel): # Ensure within project
+            potential_path_rel = _join_normalized(source_dir_norm, url_cleaned_html)
+            if potential_path_rel.startswith(norm_project_root) and _is_listed_file(potential_path_rel): # Ensure within project
                 resolved_path_abs_html = potential_path_rel
-            else:
+            elif debug_enabled:
                 logger.debug(f"HTML Link: Relative '{url_cleaned_html}' in '{source_path}' resolved to '{potential_path_rel}' which is outside project or not a file.")
         if not resolved_path_abs_html: 
-            logger.debug(f"HTML Link: Path for link '{url_val_html}' in '{source_path}' could not be resolved to an existing project file.")
+            if debug_enabled:
+                logger.debug(f"HTML Link: Path for link '{url_val_html}' in '{source_path}' could not be resolved to an existing project file.")
             continue
 
         # Ensure it's not outside the project root (double check, though resolution logic should handle it)
         if not resolved_path_abs_html.startswith(norm_project_root): 
-            logger.debug(f"HTML Link: Resolved path '{resolved_path_abs_html}' for link '{url_val_html}' in '{source_path}' is outside project. Skipping.")
+            if debug_enabled:
+                logger.debug(f"HTML Link: Resolved path '{resolved_path_abs_html}' for link '{url_val_html}' in '{source_path}' is outside project. Skipping.")
             continue
-        if resolved_path_abs_html in tracked_paths_globally and resolved_path_abs_html != source_path:
-            dep_char_html = "d" 
-            target_ext_html = os.path.splitext(resolved_path_abs_html)[1].lower()
-            if resource_type_hint_html == "style" or target_ext_html == '.css': dep_char_html = 'd' 
-            elif resource_type_hint_html == "script" or target_ext_html in ['.js', '.ts', '.tsx', '.mjs', '.cjs']: dep_char_html = 'd' 
-            elif resource_type_hint_html == "link" and target_ext_html in ['.html', '.htm', '.md', '.rst']: dep_char_html = 'd' 
-            elif resource_type_hint_html == "image" and target_ext_html in ['.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp']: dep_char_html = 'd' 
-            dependencies_paths.append((resolved_path_abs_html, dep_char_html))
-    return list(set(dependencies_paths))
+        if resolved_path_abs_html in path_to_key_info and resolved_path_abs_html != source_path:
+            # Every resource kind (stylesheet, script, page link, image) is a documentation-level dependency
+            dependencies_paths.add((sys.intern(resolved_path_abs_html), "d"))
+    return list(dependencies_paths)
 
 def _identify_css_dependencies(source_path: str, source_analysis: Dict[str, Any],
                              _file_analyses: Dict[str, Dict[str, Any]], 
                              project_root: str, 
                              path_to_key_info: Dict[str, KeyInfo]
                              ) -> List[Tuple[str, str]]:
-    dependencies_paths: List[Tuple[str, str]] = []
+    dependencies_paths: Set[Tuple[str, str]] = set() # Deduplicated as collected
     imports_in_css = source_analysis.get("imports", []) 
     source_dir_norm = os.path.dirname(source_path)
-    tracked_paths_globally = set(path_to_key_info.keys())
     norm_project_root = normalize_path(project_root)
     for import_item_css in imports_in_css:
         url_val_css = import_item_css.get("url", "") # CSS @import url(...)
-        if not url_val_css or url_val_css.startswith(('#', 'http:', 'https:', '//', 'data:')): continue
+        if not url_val_css or url_val_css.startswith(_SKIP_CSS_PREFIXES): continue
         url_val_css = url_val_css.strip('\'"') 
-        url_cleaned_css = url_val_css.split('#')[0].split('?')[0]
+        url_cleaned_css = _strip_query_fragment(url_val_css)
         if not url_cleaned_css: continue
-        resolved_path_abs_css = normalize_path(os.path.abspath(os.path.join(source_dir_norm, url_cleaned_css)))
+        resolved_path_abs_css = _join_normalized(source_dir_norm, url_cleaned_css)
         if not resolved_path_abs_css.startswith(norm_project_root):
-            logger.debug(f"CSS Import: Resolved path '{resolved_path_abs_css}' for import '{url_val_css}' in '{source_path}' is outside project. Skipping.")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"CSS Import: Resolved path '{resolved_path_abs_css}' for import '{url_val_css}' in '{source_path}' is outside project. Skipping.")
             continue
-        if os.path.isfile(resolved_path_abs_css) and resolved_path_abs_css in tracked_paths_globally and resolved_path_abs_css != source_path:
-            dependencies_paths.append((resolved_path_abs_css, "<")) 
-    return list(set(dependencies_paths))
+        if resolved_path_abs_css in path_to_key_info and resolved_path_abs_css != source_path and _is_listed_file(resolved_path_abs_css):
+            dependencies_paths.add((sys.intern(resolved_path_abs_css), "<")) 
+    return list(dependencies_paths)
 
 # --- END OF FILE dependency_suggester.py ---
\ No newline at end of file
@@ -8,6 +8,7 @@ import sys
 import torch
 import os
 import json
+import tempfile
 from typing import List, Dict, Optional, Tuple, Any
 import numpy as np
 import ast
@@ -20,7 +21,6 @@ from cline_utils.dependency_system.utils.cache_manager import cached, invalidate
 from cline_utils.dependency_system.core.key_manager import (
     KeyInfo, # Added
     validate_key,
-    sort_key_strings_hierarchically, # Import the correct sorting function
     # generate_keys is typically called *before* this, not needed here
 )
 # from cline_utils.dependency_system.io.tracker_io import read_tracker_file, write_tracker_file # Not used directly here
@@ -123,6 +123,7 @@ def generate_embeddings(project_paths: List[str],
     try: model = _load_model()
     except Exception: return False
 
+    _EMBEDDING_MATRIX_CACHE.update(key=None, row_of={}, matrix=None) # Vectors are about to change on disk
     config_manager = ConfigManager(); project_root = get_project_root()
     embeddings_dir = config_manager.get_path("embeddings_dir", "cline_utils/dependency_system/analysis/embeddings")
     if not os.path.isabs(embeddings_dir): embeddings_dir = os.path.join(project_root, embeddings_dir)
@@ -279,46 +280,31 @@ def generate_embeddings(project_paths: List[str],
             except Exception as e: logger.error(f"Failed write metadata {metadata_file}: {e}"); overall_success = False
 
     # --- End Loop ---
+    # Refresh the embedding pack here, so suggestion runs only ever read it
+    try: _get_embedding_matrix(normalize_path(embeddings_dir), path_to_key_info, project_root, refresh_pack=True)
+    except Exception as e: logger.warning(f"Could not refresh embedding pack in {embeddings_dir}: {e}")
     if overall_success: logger.info(f"Completed embedding generation for paths: {project_paths}")
     else: logger.warning(f"Embedding generation completed with errors for paths: {project_paths}")
     return overall_success
 
-# --- Similarity Calculation Helper ---
-# Add code_roots and doc_roots to signature to match calculate_similarity arguments passed by @cached
-def _get_similarity_cache_key(key1_str: str, key2_str: str, embeddings_dir: str,
-                              path_to_key_info: Dict[str, KeyInfo], project_root: str,
-                              code_roots: List[str], doc_roots: List[str], **kwargs) -> str:
-    """Generates a cache key for calculate_similarity, including .npy mtimes."""
-    norm_embeddings_dir = normalize_path(embeddings_dir)
-    norm_project_root = normalize_path(project_root)
-
-    def get_npy_mtime(key_str: str) -> float:
-        """Gets the mtime of the .npy file for a key, or 0 if not found."""
-        key_info = next((info for info in path_to_key_info.values() if info.key_string == key_str), None)
-        if not key_info or not key_info.norm_path.startswith(norm_project_root):
-            return 0.0
-        try:
-            relative_file_path = os.path.relpath(key_info.norm_path, norm_project_root)
-            npy_path = normalize_path(os.path.join(norm_embeddings_dir, relative_file_path) + ".npy")
-            if os.path.exists(npy_path):
-                return os.path.getmtime(npy_path)
-            else:
-                return 0.0
-        except (ValueError, OSError):
-            return 0.0 # Error calculating path or getting mtime
-
-    # Sort keys to ensure consistent key order
-    # Use hierarchical sorting for key strings
-    sorted_keys = sort_key_strings_hierarchically([key1_str, key2_str])
-    mtime1 = get_npy_mtime(sorted_keys[0])
-    mtime2 = get_npy_mtime(sorted_keys[1])
-
-    return f"similarity:{sorted_keys[0]}:{sorted_keys[1]}:{norm_embeddings_dir}:{mtime1}:{mtime2}"
+# --- Key Lookup ---
+# Inverse of the last path_to_key_info seen (same object and size): {"key": (map, len), "index": {key_str: KeyInfo}}
+_KEY_INFO_INDEX_CACHE: Dict[str, Any] = {"key": None, "index": {}}
+
+def _key_info_index(path_to_key_info: Dict[str, KeyInfo]) -> Dict[str, KeyInfo]:
+    """Returns {key_string: first KeyInfo with that key string}, built once per path_to_key_info instead of scanned per lookup."""
+    cache_key = _KEY_INFO_INDEX_CACHE["key"]
+    if cache_key is not None and cache_key[0] is path_to_key_info and cache_key[1] == len(path_to_key_info):
+        return _KEY_INFO_INDEX_CACHE["index"]
+    index: Dict[str, KeyInfo] = {}
+    for info in path_to_key_info.values():
+        index.setdefault(info.key_string, info)
+    _KEY_INFO_INDEX_CACHE.update(key=(path_to_key_info, len(path_to_key_info)), index=index)
+    return index
 
 # --- Similarity Calculation ---
 # <<< *** MODIFIED SIGNATURE AND LOGIC *** >>>
-@cached("similarity_calculation",
-        key_func=_get_similarity_cache_key) # Use helper function for key generation
+# Not @cached: a lookup would cost more than the dot product of two rows of the shared embedding matrix
 def calculate_similarity(key1_str: str, # Renamed for clarity
                          key2_str: str, # Renamed for clarity
                          embeddings_dir: str,
@@ -346,8 +332,9 @@ def calculate_similarity(key1_str: str, # Renamed for clarity
 
     # <<< *** MODIFIED key validation check *** >>>
     # Check if keys exist in the provided map
-    key1_info = next((info for info in path_to_key_info.values() if info.key_string == key1_str), None)
-    key2_info = next((info for info in path_to_key_info.values() if info.key_string == key2_str), None)
+    key_info_index = _key_info_index(path_to_key_info)
+    key1_info = key_info_index.get(key1_str)
+    key2_info = key_info_index.get(key2_str)
 
     if not key1_info or not key2_info:
         missing_keys = []
@@ -360,50 +347,195 @@ def calculate_similarity(key1_str: str, # Renamed for clarity
 
     if not os.path.isabs(embeddings_dir): embeddings_dir = normalize_path(os.path.join(project_root, embeddings_dir))
 
-    # <<< *** MODIFIED HELPER to use path_to_key_info *** >>>
-    def get_embedding_path(key_str: str) -> Optional[str]:
-        """Helper to find the correct .npy file path using KeyInfo."""
-        # Find the KeyInfo object for this key string
-        key_info = next((info for info in path_to_key_info.values() if info.key_string == key_str), None)
-        if not key_info:
-            logger.warning(f"Could not find KeyInfo for key string {key_str}.")
-            return None
-
-        norm_abs_file_path = key_info.norm_path # Get path from KeyInfo
-        norm_project_root = normalize_path(project_root)
-        if not norm_abs_file_path.startswith(norm_project_root):
-             logger.warning(f"File path {norm_abs_file_path} for key {key_str} is outside project root.")
-             return None
-        try:
-            relative_file_path = os.path.relpath(norm_abs_file_path, norm_project_root)
-            expected_npy_path = normalize_path(os.path.join(embeddings_dir, relative_file_path) + ".npy")
-            return expected_npy_path
-        except ValueError as e: logger.error(f"Error calc rel path for {norm_abs_file_path}: {e}"); return None
-        except Exception as e: logger.error(f"Unexpected error getting embedding path for key {key_str}: {e}"); return None
-
-
-    file1_path = get_embedding_path(key1_str)
-    file2_path = get_embedding_path(key2_str)
-
-    if not file1_path or not file2_path or not (os.path.exists(file1_path) and os.path.exists(file2_path)):
-        missing = []
-        if not file1_path or not (file1_path and os.path.exists(file1_path)): missing.append(file1_path or f"{key1_str}.npy (path error)")
-        if not file2_path or not (file2_path and os.path.exists(file2_path)): missing.append(file2_path or f"{key2_str}.npy (path error)")
-        relative_missing = [os.path.relpath(m, embeddings_dir) if m and os.path.isabs(m) and embeddings_dir in m else m for m in missing]
-        logger.debug(f"Embedding files missing/path error during similarity: {', '.join(relative_missing)}")
+    # Rows are unit-normalized once per run, so the cosine similarity is a single dot product (zero rows give 0.0)
+    row_of, matrix = _get_embedding_matrix(embeddings_dir, path_to_key_info, project_root)
+    row1 = row_of.get(key1_str); row2 = row_of.get(key2_str)
+    if row1 is None or row2 is None:
+        logger.debug(f"No usable embedding for {' and '.join(k for k, r in ((key1_str, row1), (key2_str, row2)) if r is None)}. Sim=0.")
         return 0.0
+    similarity = float(np.dot(matrix[row1], matrix[row2]))
+    return max(0.0, min(1.0, similarity))
+
+# --- Batched Similarity Calculation ---
+# Pre-normalized embedding rows of every tracked file, built once per path_to_key_info/embeddings_dir and shared by
+# all calculate_similarities_batch calls (reset by generate_embeddings): {"key": ..., "row_of": {key_str: row}, "matrix": ndarray}
+_EMBEDDING_MATRIX_CACHE: Dict[str, Any] = {"key": None, "row_of": {}, "matrix": None}
+
+def _load_embedding_vector(npy_path: str) -> Optional[np.ndarray]:
+    """Loads a flattened embedding vector, or None if the file is missing or unreadable."""
+    try:
+        vector = np.load(npy_path)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Failed to load embedding {npy_path}: {e}")
+        return None
+    return vector.flatten() if vector.ndim > 1 else vector
+
+# Single-file copy of the per-key .npy vectors (float32, flattened), so a run reads one file instead of opening and
+# parsing thousands of small ones. Each row is trusted only while its .npy file's (mtime_ns, size) still matches.
+# Only generate_embeddings refreshes it; suggestion runs just read it.
+_EMBEDDING_PACK_FILENAME = "embedding_pack.npz"
 
-    # (Loading and calculation logic unchanged)
+def _read_embedding_pack(pack_path: str) -> Dict[str, Tuple[Tuple[int, int], np.ndarray]]:
+    """Returns {path relative to project root: ((mtime_ns, size) of its .npy, vector)} from the pack, or {} if unusable."""
     try:
-        emb1 = np.load(file1_path); emb2 = np.load(file2_path)
-        if emb1.ndim > 1: emb1 = emb1.flatten()
-        if emb2.ndim > 1: emb2 = emb2.flatten()
-        norm1 = np.linalg.norm(emb1); norm2 = np.linalg.norm(emb2)
-        if norm1 == 0 or norm2 == 0: logger.debug(f"Zero vector for {key1_str if norm1==0 else ''}{' and ' if norm1==0 and norm2==0 else ''}{key2_str if norm2==0 else ''}. Sim=0."); return 0.0
-        similarity = float(np.dot(emb1, emb2) / (norm1 * norm2))
-        return max(0.0, min(1.0, similarity))
+        with np.load(pack_path, allow_pickle=False) as pack:
+            relative_paths, signatures, vectors = pack["paths"].tolist(), pack["stats"].tolist(), pack["vectors"]
+    except FileNotFoundError:
+        return {}
     except Exception as e:
-        logger.exception(f"Failed similarity calc for {key1_str} & {key2_str}: {e}"); return 0.0
+        logger.debug(f"Embedding pack {pack_path} unreadable ({e}). Loading .npy files individually.")
+        return {}
+    return {relative_path: (tuple(signature), vectors[row])
+            for row, (relative_path, signature) in enumerate(zip(relative_paths, signatures))}
+
+def _write_embedding_pack(pack_path: str, relative_paths: List[str], signatures: List[Tuple[int, int]],
+                          vectors: np.ndarray) -> None:
+    """Writes the pack to a temp file beside it and moves it into place, so readers never see a partial pack."""
+    temp_path = None
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(pack_path), prefix=".embedding_pack.", suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f: # File object: np.savez would otherwise append its own extension
+            np.savez(f, paths=np.array(relative_paths), stats=np.array(signatures, dtype=np.int64).reshape(-1, 2), vectors=vectors)
+        os.replace(temp_path, pack_path)
+    except OSError as e:
+        logger.warning(f"Could not write embedding pack {pack_path}: {e}")
+        if temp_path is not None:
+            try: os.remove(temp_path)
+            except OSError: pass
+
+def _get_embedding_matrix(embeddings_dir: str, path_to_key_info: Dict[str, KeyInfo],
+                          project_root: str, refresh_pack: bool = False) -> Tuple[Dict[str, int], np.ndarray]:
+    """
+    Returns ({key_string: row}, matrix) where each row is the unit-normalized embedding of a tracked file
+    (zero rows stay zero). The first KeyInfo per key string is used, as in calculate_similarity's lookups.
+    Vectors whose shape differs from the most common one are left out (they could not be compared anyway).
+    Vectors come from the embedding pack where it is current. With refresh_pack (generate_embeddings only),
+    the pack is rewritten if any of them had to be loaded from its .npy file.
+    """
+    cache_key = _EMBEDDING_MATRIX_CACHE["key"]
+    if cache_key is not None and cache_key[0] is path_to_key_info and cache_key[1] == embeddings_dir and \
+       cache_key[2] == project_root and cache_key[3] == len(path_to_key_info):
+        return _EMBEDDING_MATRIX_CACHE["row_of"], _EMBEDDING_MATRIX_CACHE["matrix"]
+
+    norm_project_root = normalize_path(project_root)
+    pack_path = os.path.join(embeddings_dir, _EMBEDDING_PACK_FILENAME)
+    packed = _read_embedding_pack(pack_path)
+    vectors_by_key: Dict[str, np.ndarray] = {}
+    pack_entries: Dict[str, Tuple[str, Tuple[int, int]]] = {} # key_string -> (relative path, .npy signature)
+    loaded_keys = set() # Keys whose vector was not (validly) in the pack
+    for info in _key_info_index(path_to_key_info).values():
+        if info.is_directory: continue
+        if not info.norm_path.startswith(norm_project_root) or not validate_key(info.key_string): continue
+        try:
+            relative_file_path = os.path.relpath(info.norm_path, norm_project_root)
+        except ValueError:
+            continue
+        npy_path = normalize_path(os.path.join(embeddings_dir, relative_file_path) + ".npy")
+        try:
+            npy_stat = os.stat(npy_path)
+        except FileNotFoundError:
+            continue
+        except OSError:
+            npy_stat = None # Let the load below report it
+        signature = (npy_stat.st_mtime_ns, npy_stat.st_size) if npy_stat else None
+        packed_entry = packed.get(relative_file_path)
+        if signature and packed_entry is not None and packed_entry[0] == signature:
+            vector = packed_entry[1]
+        else:
+            vector = _load_embedding_vector(npy_path)
+            loaded_keys.add(info.key_string)
+        if vector is not None:
+            vectors_by_key[info.key_string] = vector
+            if signature: pack_entries[info.key_string] = (relative_file_path, signature)
+
+    row_of: Dict[str, int] = {}
+    matrix = np.zeros((0, 0), dtype=np.float32)
+    if vectors_by_key:
+        shape_counts: Dict[Tuple[int, ...], int] = {}
+        for vector in vectors_by_key.values():
+            shape_counts[vector.shape] = shape_counts.get(vector.shape, 0) + 1
+        common_shape = max(shape_counts, key=shape_counts.get)
+        kept_vectors = []
+        for key_str, vector in vectors_by_key.items():
+            if vector.shape != common_shape:
+                logger.debug(f"Embedding for {key_str} has shape {vector.shape}, expected {common_shape}. Excluded from similarity.")
+                continue
+            row_of[key_str] = len(kept_vectors)
+            kept_vectors.append(vector)
+        # float32 regardless of the stored dtype: scores are returned as float32 anyway, so wider rows only add memory traffic
+        matrix = np.stack(kept_vectors).astype(np.float32, copy=False)
+        if refresh_pack and any(key_str in loaded_keys for key_str in row_of):
+            packed_keys = [key_str for key_str in row_of if key_str in pack_entries]
+            _write_embedding_pack(pack_path, [pack_entries[key_str][0] for key_str in packed_keys],
+                                  [pack_entries[key_str][1] for key_str in packed_keys],
+                                  matrix[[row_of[key_str] for key_str in packed_keys]])
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+    _EMBEDDING_MATRIX_CACHE.update(key=(path_to_key_info, embeddings_dir, project_root, len(path_to_key_info)),
+                                   row_of=row_of, matrix=matrix)
+    return row_of, matrix
+
+def get_embedding_matrix(embeddings_dir: str, path_to_key_info: Dict[str, KeyInfo],
+                         project_root: str) -> Tuple[Dict[str, int], np.ndarray]:
+    """Returns the shared ({key_string: row}, unit-row matrix) pair, building it now if needed; see _get_embedding_matrix."""
+    if not os.path.isabs(embeddings_dir): embeddings_dir = normalize_path(os.path.join(project_root, embeddings_dir))
+    return _get_embedding_matrix(embeddings_dir, path_to_key_info, project_root)
+
+def has_embedding(key_str: str, embeddings_dir: str, path_to_key_info: Dict[str, KeyInfo], project_root: str) -> bool:
+    """True if key_str has a non-zero vector in the shared embedding matrix, i.e. it can score above 0.0 against any key."""
+    if not os.path.isabs(embeddings_dir): embeddings_dir = normalize_path(os.path.join(project_root, embeddings_dir))
+    row_of, matrix = _get_embedding_matrix(embeddings_dir, path_to_key_info, project_root)
+    row = row_of.get(key_str)
+    return row is not None and bool(matrix[row].any())
+
+def calculate_similarities_batch(source_key_str: str,
+                                 target_key_strs: List[str],
+                                 embeddings_dir: str,
+                                 path_to_key_info: Dict[str, KeyInfo],
+                                 project_root: str,
+                                 code_roots: List[str],
+                                 doc_roots: List[str]) -> np.ndarray:
+    """
+    Calculate cosine similarities between one key and many keys with a single matrix-vector product.
+    Equivalent to calling calculate_similarity(source_key_str, t, ...) for each t in target_key_strs.
+
+    Args:
+        source_key_str: Key string of the source file
+        target_key_strs: Key strings of the target files
+        embeddings_dir: Base directory containing mirrored embedding .npy files
+        path_to_key_info: Global map from normalized paths to KeyInfo objects.
+        project_root: Root directory of the project
+        code_roots: List of code root directories (relative to project_root)
+        doc_roots: List of documentation root directories (relative to project_root)
+
+    Returns:
+        Array of similarity scores (0.0 to 1.0), one per target; 0.0 where a score cannot be computed
+    """
+    similarities = np.zeros(len(target_key_strs), dtype=np.float32)
+    if not target_key_strs or not validate_key(source_key_str):
+        return similarities
+
+    if not os.path.isabs(embeddings_dir): embeddings_dir = normalize_path(os.path.join(project_root, embeddings_dir))
+    row_of, matrix = _get_embedding_matrix(embeddings_dir, path_to_key_info, project_root)
+
+    source_row = row_of.get(source_key_str)
+    if source_row is None:
+        logger.debug(f"No embedding for source key {source_key_str}. Similarities are 0.")
+        return similarities
+    source_vector = matrix[source_row]
+    if not source_vector.any():
+        return similarities
+
+    # Rows are unit-length, so one GEMV over the whole matrix gives every cosine; targets are gathered afterwards
+    scores = matrix @ source_vector
+    target_rows = np.fromiter((row_of.get(target_key_str, -1) for target_key_str in target_key_strs),
+                              dtype=np.intp, count=len(target_key_strs))
+    has_embedding = target_rows >= 0
+    similarities[has_embedding] = np.clip(scores[target_rows[has_embedding]], 0.0, 1.0)
+    similarities[target_rows == source_row] = 1.0
+    return similarities
 
 # --- File Validation Helper ---
 @cached("file_validation",
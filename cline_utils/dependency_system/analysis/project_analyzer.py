@@ -13,7 +13,7 @@ from cline_utils.dependency_system.core import key_manager
 import logging
 from cline_utils.dependency_system.analysis.dependency_analyzer import analyze_file
 from cline_utils.dependency_system.utils.batch_processor import BatchProcessor, process_items
-from cline_utils.dependency_system.analysis.dependency_suggester import suggest_dependencies
+from cline_utils.dependency_system.analysis.dependency_suggester import ASTLink, suggest_dependencies_batch, write_project_symbol_map_sidecar
 from cline_utils.dependency_system.analysis.embedding_manager import generate_embeddings
 from cline_utils.dependency_system.utils.cache_manager import cached, file_modified, clear_all_caches, cache_manager
 from cline_utils.dependency_system.utils.config_manager import ConfigManager
@@ -30,6 +30,8 @@ PathMigrationInfo = Dict[str, Tuple[Optional[str], Optional[str]]]
 # --- ADDED: Constants for the new symbol map ---
 PROJECT_SYMBOL_MAP_FILENAME = "project_symbol_map.json"
 OLD_PROJECT_SYMBOL_MAP_FILENAME = "project_symbol_map_old.json"
+PROJECT_SYMBOL_MAP_BINARY_FILENAME = "project_symbol_map.pkl" # Pickle sidecar of the JSON, rotated with it
+OLD_PROJECT_SYMBOL_MAP_BINARY_FILENAME = "project_symbol_map_old.pkl"
 
 # --- Constants for the AST verified links file ---
 AST_VERIFIED_LINKS_FILENAME = "ast_verified_links.json"
@@ -224,14 +226,20 @@ def analyze_project(force_analysis: bool = False, force_embeddings: bool = False
             core_dir = os.path.dirname(os.path.abspath(key_manager.__file__))
             current_symbol_map_path = normalize_path(os.path.join(core_dir, PROJECT_SYMBOL_MAP_FILENAME))
             old_symbol_map_path = normalize_path(os.path.join(core_dir, OLD_PROJECT_SYMBOL_MAP_FILENAME))
+            current_symbol_binary_path = normalize_path(os.path.join(core_dir, PROJECT_SYMBOL_MAP_BINARY_FILENAME))
+            old_symbol_binary_path = normalize_path(os.path.join(core_dir, OLD_PROJECT_SYMBOL_MAP_BINARY_FILENAME))
             os.makedirs(core_dir, exist_ok=True)
 
             if os.path.exists(current_symbol_map_path):
                 try: shutil.move(current_symbol_map_path, old_symbol_map_path)
                 except OSError as rename_err: logger.error(f"Failed to rename current symbol map to old: {rename_err}")
+            if os.path.exists(current_symbol_binary_path): # Its stamp still matches the rotated JSON
+                try: shutil.move(current_symbol_binary_path, old_symbol_binary_path)
+                except OSError as rename_err: logger.error(f"Failed to rename current symbol map sidecar to old: {rename_err}")
             
             with open(current_symbol_map_path, 'w', encoding='utf-8') as f_sym:
                 json.dump(project_symbol_data, f_sym, indent=2)
+            write_project_symbol_map_sidecar(project_symbol_data, current_symbol_map_path, current_symbol_binary_path)
             logger.info(f"Successfully saved project symbol map to: {current_symbol_map_path} ({len(project_symbol_data)} files)")
             analysis_results["symbol_map_generation"]["status"] = "success"
             analysis_results["symbol_map_generation"]["path"] = current_symbol_map_path
@@ -285,7 +293,7 @@ def analyze_project(force_analysis: bool = False, force_embeddings: bool = False
     # --- >>> INITIALIZE all_suggestions HERE <<< ---
     all_path_based_suggestions: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
     # --- Initialize list to collect all AST-verified links from the project ---
-    all_project_ast_links: List[Dict[str, str]] = []
+    all_project_ast_links: List[ASTLink] = []
 
     analyzed_file_paths = list(file_analysis_results.keys())
     # Use configured threshold for doc_similarity
@@ -294,20 +302,18 @@ def analyze_project(force_analysis: bool = False, force_embeddings: bool = False
     # --- Store the length of the last printed progress line ---
     _last_progress_message_length = 0
 
-    for i, file_path_abs in enumerate(analyzed_file_paths):
-        file_key_info = path_to_key_info.get(file_path_abs)
-        if not file_key_info:
+    suggestable_file_paths = []
+    for file_path_abs in analyzed_file_paths:
+        if not path_to_key_info.get(file_path_abs):
             logger.warning(f"No key info found for analyzed file {file_path_abs}, skipping suggestion.")
             continue
-        
-        # --- MODIFICATION: Unpack two return values from suggest_dependencies ---
-        suggestions_for_file, ast_links_for_file = suggest_dependencies(
-            file_path_abs, 
-            path_to_key_info, 
-            project_root,
-            file_analysis_results, 
-            threshold=doc_similarity_threshold
-        )
+        suggestable_file_paths.append(file_path_abs)
+
+    def _on_suggestion_result(i: int, suggestion_result: Tuple[List[Tuple[str, str]], List[ASTLink]]) -> None:
+        """Collects one file's suggestions and updates the progress line, as the batch produces them."""
+        nonlocal _last_progress_message_length
+        file_path_abs = suggestable_file_paths[i]
+        suggestions_for_file, ast_links_for_file = suggestion_result
         if suggestions_for_file:
             all_path_based_suggestions[file_path_abs].extend(suggestions_for_file) # Use the initialized variable
             analysis_results["dependency_suggestion"]["suggestion_count"] += len(suggestions_for_file)
@@ -318,11 +324,11 @@ def analyze_project(force_analysis: bool = False, force_embeddings: bool = False
             analysis_results["dependency_suggestion"]["ast_link_count"] += len(ast_links_for_file)
         
         # --- UPDATED LOGGING FOR PROGRESS (More Robust Line Clearing) ---
-        progress_percent = ((i + 1) / len(analyzed_file_paths)) * 100
+        progress_percent = ((i + 1) / len(suggestable_file_paths)) * 100
         current_suggestion_count = analysis_results["dependency_suggestion"]["suggestion_count"]
         current_ast_link_count = analysis_results["dependency_suggestion"]["ast_link_count"] # Get current count
         progress_message = (
-            f"Dependency Suggestion: Processed {i+1}/{len(analyzed_file_paths)} files ({progress_percent:.1f}%) - "
+            f"Dependency Suggestion: Processed {i+1}/{len(suggestable_file_paths)} files ({progress_percent:.1f}%) - "
             f"Found {current_suggestion_count} char suggestions, {current_ast_link_count} AST links..."
         )        
         # 1. Move cursor to beginning of the line
@@ -336,7 +342,17 @@ def analyze_project(force_analysis: bool = False, force_embeddings: bool = False
         _last_progress_message_length = len(progress_message)
         # --- END OF UPDATED LOGGING ---
 
-    # After the loop:
+    # Suggestions are independent per file; compute them in a process pool, reporting progress as results come in
+    suggest_dependencies_batch(
+        suggestable_file_paths,
+        path_to_key_info,
+        project_root,
+        file_analysis_results,
+        threshold=doc_similarity_threshold,
+        on_result=_on_suggestion_result
+    )
+
+    # After the batch:
     # 1. Clear the last progress line
     print(end='\r')
     print(" " * _last_progress_message_length, end='\r') 
@@ -367,7 +383,7 @@ def analyze_project(force_analysis: bool = False, force_embeddings: bool = False
                     logger.error(f"Failed to rename current AST verified links file to old: {rename_err}")
             
             with open(current_ast_links_path, 'w', encoding='utf-8') as f_ast_links:
-                json.dump(all_project_ast_links, f_ast_links, indent=2)
+                json.dump([link._asdict() for link in all_project_ast_links], f_ast_links, indent=2)
             logger.info(f"Successfully saved AST verified links to: {current_ast_links_path} ({len(all_project_ast_links)} links)")
             analysis_results["ast_verified_links_generation"]["status"] = "success"
             analysis_results["ast_verified_links_generation"]["path"] = current_ast_links_path
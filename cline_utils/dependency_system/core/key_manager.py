@@ -12,6 +12,7 @@ import os
 import re
 import json # Added for saving/loading map
 import shutil # Added for renaming
+import sys
 from typing import Dict, List, Tuple, Optional, Set, NamedTuple
 from collections import defaultdict
 
@@ -153,7 +154,7 @@ def generate_keys(root_paths: List[str], excluded_dirs: Optional[Set[str]] = Non
         nonlocal path_to_key_info, newly_generated_keys, top_level_dir_count
 
         try:
-            norm_dir_path = normalize_path(dir_path)
+            norm_dir_path = sys.intern(normalize_path(dir_path)) # Interned: used as a dict key throughout analysis
 
             # 1. Skip excluded directories
             if any(norm_dir_path.startswith(ex_path) for ex_path in exclusion_set):
@@ -210,7 +211,7 @@ def generate_keys(root_paths: List[str], excluded_dirs: Optional[Set[str]] = Non
             for item_name in items:
                 try:
                     item_path = os.path.join(dir_path, item_name)
-                    norm_item_path = normalize_path(item_path)
+                    norm_item_path = sys.intern(normalize_path(item_path))
                     is_dir = os.path.isdir(item_path); is_file = os.path.isfile(item_path)
 
                     # Apply standard exclusions (name, type, extension, etc.)
@@ -420,7 +421,10 @@ def load_global_key_map() -> Optional[Dict[str, KeyInfo]]:
         # Convert dictionary data back into KeyInfo objects
         path_to_key_info: Dict[str, KeyInfo] = {}
         for path, info_dict in loaded_data.items():
-            try: path_to_key_info[path] = KeyInfo(**info_dict)
+            try:
+                path = sys.intern(path)
+                if info_dict.get("norm_path") == path: info_dict["norm_path"] = path # Share the interned key string
+                path_to_key_info[path] = KeyInfo(**info_dict)
             except TypeError as te:
                 logger.error(f"Error converting loaded data to KeyInfo for path '{path}'. Data: {info_dict}. Error: {te}")
                 # Skip this entry or return None entirely? For now, skip.
@@ -236,6 +236,7 @@ def get_tracker_cache_key(tracker_path: str, tracker_type: str) -> str:
 def clear_all_caches() -> None:
     """Clear all caches in the manager."""
     cache_manager.clear_all()
+    normalize_path.cache_clear() # Memoized outside the manager (see path_utils)
 
 def invalidate_dependent_entries(cache_name: str, key_pattern: str) -> None: 
     """Invalidate cache entries matching a key pattern in a specific cache."""
@@ -5,6 +5,7 @@ Core module for path utilities.
 Handles path normalization, validation, and comparison.
 """
 
+import functools
 import os
 import re
 from typing import List, Optional, Set, Union, Tuple
@@ -16,6 +17,7 @@ logger = logging.getLogger(__name__)
 # HIERARCHICAL_KEY_PATTERN = r'^\d+[A-Z][a-z0-9]*$' # Removed
 # KEY_PATTERN = r'\d+|\D+' # Removed
 
+@functools.lru_cache(maxsize=200_000) # Pure string work per distinct input; cleared by cache_manager.clear_all_caches
 def normalize_path(path: str) -> str:
     """
     Normalize a file path for consistent comparison.
@@ -26,32 +28,25 @@ def normalize_path(path: str) -> str:
     Returns:
         Normalized path
     """
-    from .cache_manager import cached # Keep import near usage if re-enabled
-
-    @cached("path_normalization",
-           key_func=lambda p: f"normalize:{p if p else 'empty'}")
-    def _normalize_path(p: str) -> str:
-        if not p: return ""
-        # Ensure absolute path before normpath for consistency, especially with relative inputs
-        # Use os.path.abspath cautiously if CWD is not guaranteed to be project root during execution
-        # Let's assume paths passed are either absolute or meant to be relative to CWD when called
-        # If relative paths need resolving against project_root, do it *before* calling normalize_path
-        # However, making it absolute generally prevents unexpected behavior.
-        if not os.path.isabs(p):
-            p = os.path.abspath(p) # Make absolute based on CWD
-        normalized = os.path.normpath(p).replace("\\", "/")
-        # Lowercase drive letter on Windows for consistency
-        if os.name == 'nt' and re.match(r"^[a-zA-Z]:", normalized):
-             normalized = normalized[0].lower() + normalized[1:]
-        # Remove trailing slash unless it's the root directory
-        if len(normalized) > 1 and normalized.endswith('/'):
-             normalized = normalized.rstrip('/')
-        elif os.name == 'nt' and len(normalized) > 3 and normalized.endswith('/'): # Handle C:/ case
-             normalized = normalized.rstrip('/')
-
-        return normalized
-
-    return _normalize_path(path)
+    if not path: return ""
+    # Ensure absolute path before normpath for consistency, especially with relative inputs
+    # Use os.path.abspath cautiously if CWD is not guaranteed to be project root during execution
+    # Let's assume paths passed are either absolute or meant to be relative to CWD when called
+    # If relative paths need resolving against project_root, do it *before* calling normalize_path
+    # However, making it absolute generally prevents unexpected behavior.
+    if not os.path.isabs(path):
+        path = os.path.abspath(path) # Make absolute based on CWD
+    normalized = os.path.normpath(path).replace("\\", "/")
+    # Lowercase drive letter on Windows for consistency
+    if os.name == 'nt' and re.match(r"^[a-zA-Z]:", normalized):
+         normalized = normalized[0].lower() + normalized[1:]
+    # Remove trailing slash unless it's the root directory
+    if len(normalized) > 1 and normalized.endswith('/'):
+         normalized = normalized.rstrip('/')
+    elif os.name == 'nt' and len(normalized) > 3 and normalized.endswith('/'): # Handle C:/ case
+         normalized = normalized.rstrip('/')
+
+    return normalized
 
 
 def get_file_type(file_path: str) -> str: